@@ -1,88 +1,145 @@
+import sys
+import time
+
+import numpy as np
 import pandas as pd
-import psycopg2
 from datetime import datetime
 
+from db import get_connection, release_connection
+from input_workbook import read_input_workbook
+from parallel_validation import run_sharded
+from ticker_set import ticker_table
+from validation_schema import MEETING_VALIDATION_SCHEMA, apply_schema
+
 # --- Config ---
 input_file = "Russell3000 Feb 2025(Upcoming shareholder meeting).xlsx"
 output_file = "Validated_Shareholder_Meetings.xlsx"
-DB_CONFIG = {
-#    // Please Add DB Creds
-}
+# Validate large inputs in ticker-hash shards across worker processes (run with --parallel)
+PARALLEL_VALIDATION = '--parallel' in sys.argv
 
 def connect_to_db():
     try:
-        conn = psycopg2.connect(**DB_CONFIG)
-        conn.autocommit = True
+        conn = get_connection()
         print("✅ Database connected successfully")
         return conn
     except Exception as e:
         print(f"❌ Database connection failed: {e}")
         return None
 
+# Original single-query fetch: vds x sp_def14a per company (N x M rows), kept for benchmark_fetch
+JOINED_QUERY = """
+SELECT DISTINCT
+    c.id,
+    c."name" as company_name,
+    c.symbol,
+    c.exchng_ticker,
+    c.country,
+    v.meeting_date,
+    v.meeting_type,
+    v.proposal,
+    v.proposal_num,
+    s.proxy_season,
+    s.proposal_name,
+    s.proponent
+FROM public.company c
+LEFT JOIN public.vds v ON c.id = v.company_id
+LEFT JOIN public.sp_def14a s ON c.id = s.company_id
+WHERE c.symbol IN (SELECT ticker FROM {table})
+ORDER BY c.symbol, v.meeting_date;
+"""
+
+# Meeting rows per company (N rows) - one row with NULL meeting fields when a company has none
+MEETINGS_QUERY = """
+SELECT DISTINCT
+    c.id,
+    c."name" as company_name,
+    c.symbol,
+    v.meeting_date,
+    v.meeting_type,
+    v.proposal,
+    v.proposal_num
+FROM public.company c
+LEFT JOIN public.vds v ON c.id = v.company_id
+WHERE c.symbol IN (SELECT ticker FROM {table})
+ORDER BY c.symbol, v.meeting_date, v.proposal_num;
+"""
+
+# def14a proposal details per company (M rows)
+PROPOSALS_QUERY = """
+SELECT DISTINCT
+    c.symbol,
+    s.proxy_season,
+    s.proposal_name,
+    s.proponent
+FROM public.company c
+JOIN public.sp_def14a s ON c.id = s.company_id
+WHERE c.symbol IN (SELECT ticker FROM {table})
+ORDER BY c.symbol, s.proxy_season;
+"""
+
 def fetch_company_data_by_ticker(conn, tickers):
-    """Fetch company data using the correct table structure"""
+    """Fetch meetings and def14a proposals per ticker as two narrow result sets.
+
+    Returns {symbol: {'company_name', 'meetings': [...], 'proposals': [...]}}.
+    Joining vds and sp_def14a in one query would return every meeting row
+    paired with every proposal row of the company.
+    """
     try:
-        placeholders = ', '.join(['%s'] * len(tickers))
-        
         print(f"\n🔍 Querying for {len(tickers)} tickers...")
         print(f"Sample tickers: {tickers[:5]}")
         
-        # Main query to get company data with meeting dates
-        query = f"""
-        SELECT DISTINCT
-            c.id,
-            c."name" as company_name,
-            c.symbol,
-            c.exchng_ticker,
-            c.country,
-            v.meeting_date,
-            v.meeting_type,
-            v.proposal,
-            v.proposal_num,
-            s.proxy_season,
-            s.proposal_name,
-            s.proponent
-        FROM public.company c
-        LEFT JOIN public.vds v ON c.id = v.company_id
-        LEFT JOIN public.sp_def14a s ON c.id = s.company_id
-        WHERE c.symbol IN ({placeholders})
-        ORDER BY c.symbol, v.meeting_date;
-        """
-        
-        with conn.cursor() as cur:
-            cur.execute(query, tickers)
-            rows = cur.fetchall()
-            print(f"✅ Query returned {len(rows)} rows")
-            if rows:
-                print(f"📊 First row: {rows[0]}")
+        db_lookup = {}
+        with ticker_table(conn, tickers) as table, conn.cursor() as cur:
+            cur.execute(MEETINGS_QUERY.format(table=table))
+            meeting_rows = cur.fetchall()
+            for _, company_name, symbol, meeting_date, meeting_type, proposal, proposal_num in meeting_rows:
+                entry = db_lookup.setdefault(symbol, {'company_name': company_name, 'meetings': [], 'proposals': []})
+                if meeting_date is not None:
+                    entry['meetings'].append({
+                        'meeting_date': meeting_date,
+                        'meeting_type': meeting_type,
+                        'proposal': proposal,
+                        'proposal_num': proposal_num,
+                    })
+            
+            cur.execute(PROPOSALS_QUERY.format(table=table))
+            proposal_rows = cur.fetchall()
+            for symbol, proxy_season, proposal_name, proponent in proposal_rows:
+                db_lookup[symbol]['proposals'].append({
+                    'proxy_season': proxy_season,
+                    'proposal_name': proposal_name,
+                    'proponent': proponent,
+                })
         
-        return rows
+        print(f"✅ Query returned {len(meeting_rows)} meeting rows and {len(proposal_rows)} proposal rows "
+              f"for {len(db_lookup)} companies")
+        return db_lookup
         
     except Exception as e:
         print(f"❌ Database query failed: {e}")
-        return []
+        return {}
+
+def benchmark_fetch(conn, tickers):
+    """Report row counts and timings of the joined query vs the split fetch"""
+    print("\n⏱️ Comparing joined vs split fetch...")
+    with ticker_table(conn, tickers) as table, conn.cursor() as cur:
+        start = time.perf_counter()
+        cur.execute(JOINED_QUERY.format(table=table))
+        joined_rows = len(cur.fetchall())
+        joined_time = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    db_lookup = fetch_company_data_by_ticker(conn, tickers)
+    split_time = time.perf_counter() - start
+    split_rows = sum(max(1, len(entry['meetings'])) + len(entry['proposals']) for entry in db_lookup.values())
+    
+    print(f"   Joined (vds x sp_def14a): {joined_rows:,} rows in {joined_time:.2f}s")
+    print(f"   Split (vds + sp_def14a): {split_rows:,} rows in {split_time:.2f}s")
 
-def analyze_date_patterns(df, db_results):
+def analyze_date_patterns(df, db_lookup):
     """Analyze patterns in date mismatches to understand the issue"""
     print("\n🔍 Analyzing date patterns...")
     
-    # Create a dictionary for quick lookup
-    db_lookup = {}
-    for row in db_results:
-        symbol = row[2]  # c.symbol
-        if symbol not in db_lookup:
-            db_lookup[symbol] = []
-        db_lookup[symbol].append({
-            'company_name': row[1],
-            'meeting_date': row[5],
-            'meeting_type': row[6],
-            'proposal': row[7],
-            'proposal_num': row[8],
-            'proxy_season': row[9],
-            'proposal_name': row[10],
-            'proponent': row[11]
-        })
-    
     # Analyze first few mismatches
     mismatch_count = 0
     for index, row in df.iterrows():
@@ -92,7 +149,7 @@ def analyze_date_patterns(df, db_results):
         refined_ticker = row['Refined_Ticker']
         input_meeting_date = row['Shareholder Meeting Date']
         
-        db_matches = db_lookup.get(refined_ticker, [])
+        db_matches = db_lookup.get(refined_ticker, {}).get('meetings', [])
         if db_matches:
             try:
                 input_date = pd.to_datetime(input_meeting_date)
@@ -111,132 +168,181 @@ def analyze_date_patterns(df, db_results):
             except:
                 continue
 
-def validate_shareholder_meetings(df, db_results):
-    """Validate shareholder meeting dates against database results"""
+def _parse_dates(values, label):
+    """Parse a column of dates written in any mix of formats; reports values that still don't parse.
+
+    A single-format parse infers the format from the first value and turns
+    every differently written date into NaT; format='mixed' parses each
+    value on its own, as the per-row pd.to_datetime calls used to.
+    """
+    parsed = pd.to_datetime(values, errors='coerce', format='mixed')
+    unparsed = int((values.notna() & parsed.isna()).sum())
+    if unparsed:
+        print(f"⚠️ {unparsed} {label} could not be parsed as dates and are treated as missing")
+    return parsed
+
+def _nearest_meetings(ticker_codes, input_dates, db_lookup):
+    """Nearest DB meeting per input row, by ticker and date.
+
+    ticker_codes are positions in db_lookup (-1 = not found). Returns
+    (meeting_date, proposal, db_date, diff_days) aligned with the input.
+    The distance is abs(floor((input - db) / 1 day)) and ties go to the
+    earliest meeting, as in the row-by-row scan this replaces.
+    """
+    meetings = pd.DataFrame(
+        [(code, m['meeting_date'], m['proposal'])
+         for code, entry in enumerate(db_lookup.values()) for m in entry['meetings']],
+        columns=['ticker', 'meeting_date', 'proposal'],
+    )
+    meetings['db_date'] = _parse_dates(meetings['meeting_date'], 'database meeting dates')
+    # Meetings arrive sorted by date; keep the first row per (ticker, date) like the scan did
+    meetings = (meetings.dropna(subset=['db_date'])
+                .drop_duplicates(['ticker', 'db_date'])
+                .sort_values('db_date', kind='stable')
+                .astype({'ticker': 'int64', 'db_date': 'datetime64[ns]'}))
+
+    left = pd.DataFrame({
+        'row': np.arange(len(ticker_codes)),
+        'ticker': ticker_codes,
+        'input_date': input_dates.to_numpy().astype('datetime64[ns]'),  # merge_asof needs matching units
+    })
+    left = (left[(left['ticker'] >= 0) & left['input_date'].notna()]
+            .sort_values('input_date', kind='stable', ignore_index=True))
+
+    day = pd.Timedelta(days=1)
+    asof = dict(right_on='db_date', by='ticker')
+    nearest_before = pd.merge_asof(left, meetings[['ticker', 'db_date']], left_on='input_date',
+                                   direction='backward', **asof)
+    after = pd.merge_asof(left, meetings, left_on='input_date', direction='forward',
+                          allow_exact_matches=False, **asof)
+
+    # Earlier meetings less than (diff + 1) days back are all equally near; the scan kept the earliest
+    diff_nearest = (left['input_date'] - nearest_before['db_date']) // day
+    left['window_start'] = (left['input_date'] - (diff_nearest + 1) * day).fillna(left['input_date'])
+    before = pd.merge_asof(left.sort_values('window_start', kind='stable'), meetings, left_on='window_start',
+                           direction='forward', allow_exact_matches=False, **asof)
+    before.loc[before['row'].isin(left.loc[diff_nearest.isna(), 'row']), ['meeting_date', 'proposal', 'db_date']] = None
+
+    rows = np.arange(len(ticker_codes))
+    before = before.set_index('row').reindex(rows)
+    after = after.set_index('row').reindex(rows)
+
+    diff_before = (input_dates.to_numpy() - before['db_date']) // day
+    diff_after = ((input_dates.to_numpy() - after['db_date']) // day).abs()
+    use_after = diff_before.isna() | (diff_after < diff_before)
+    columns = ['meeting_date', 'proposal', 'db_date']
+    best = before[columns].mask(use_after, after[columns])
+    best['diff_days'] = diff_before.mask(use_after, diff_after)
+    return best['meeting_date'], best['proposal'], best['db_date'], best['diff_days']
+
+def validate_shareholder_meetings(df, db_lookup):
+    """Validate shareholder meeting dates against database results.
+
+    Dates are parsed once and each input row is joined to its nearest DB
+    meeting with merge_asof; bands and notes are assigned column-wise.
+    """
+    print(f"\n🔄 Starting validation for {len(df)} companies...")
     
-    # Create a dictionary for quick lookup
-    db_lookup = {}
-    for row in db_results:
-        symbol = row[2]  # c.symbol
-        if symbol not in db_lookup:
-            db_lookup[symbol] = []
-        db_lookup[symbol].append({
-            'company_name': row[1],
-            'meeting_date': row[5],
-            'meeting_type': row[6],
-            'proposal': row[7],
-            'proposal_num': row[8],
-            'proxy_season': row[9],
-            'proposal_name': row[10],
-            'proponent': row[11]
-        })
+    tickers = df['Refined_Ticker']
+    input_dates = _parse_dates(df['Shareholder Meeting Date'], 'input meeting dates')
+    ticker_codes = pd.Index(list(db_lookup), dtype=object).get_indexer(tickers.astype(object))
+    db_meeting_date, db_proposal, db_dates, diff_days = _nearest_meetings(ticker_codes, input_dates, db_lookup)
     
-    # Add validation columns
-    df['Validation_Status'] = None
-    df['Database_Meeting_Date'] = None
-    df['Database_Company_Name'] = None
-    df['Database_Proposal'] = None
-    df['Match_Method'] = None
-    df['Validation_Notes'] = None
-    df['Date_Difference_Days'] = None
+    found = ticker_codes >= 0
+    has_match = found & diff_days.notna().to_numpy()
+    diff = diff_days.to_numpy()
+    exact = has_match & (input_dates.to_numpy() == db_dates.to_numpy())
     
-    valid_count = 0
-    invalid_count = 0
-    not_found_count = 0
-    ticker_matches = 0
+    statuses = np.select(
+        [~found, ~has_match, exact, diff <= 1, diff <= 7, diff <= 30],
+        ['🔍 Not Found', '⚠️ No Meeting Date', '✅ Exact Match', '✅ Close Match', '⚠️ Week Match', '⚠️ Month Match'],
+        '❌ Large Difference',
+    )
     
-    print(f"\n🔄 Starting validation for {len(df)} companies...")
+    # Notes are only built for the rows that need them
+    comparison = pd.Series('', index=df.index)
+    comparison[has_match] = (
+        'Input ' + input_dates[has_match].dt.strftime('%Y-%m-%d')
+        + ', DB ' + db_dates[has_match].dt.strftime('%Y-%m-%d')
+        + ' (diff: ' + diff_days[has_match].astype('int64').astype(str) + ' days)'
+    ).to_numpy()
+    notes = np.select(
+        [~found, ~has_match, exact, diff <= 1, diff <= 7, diff <= 30],
+        [
+            ('Ticker "' + tickers.astype(str) + '" not found in database').to_numpy(),
+            'Company found but no meeting date in database',
+            'Meeting dates match exactly',
+            ('Dates very close: ' + comparison).to_numpy(),
+            ('Dates within week: ' + comparison).to_numpy(),
+            ('Dates within month: ' + comparison).to_numpy(),
+        ],
+        ('Dates differ significantly: ' + comparison).to_numpy(),
+    )
     
-    for index, row in df.iterrows():
-        if index % 100 == 0:
-            print(f"   Processing record {index + 1}/{len(df)}")
-        
-        refined_ticker = row['Refined_Ticker']
-        company_name = row['Company']
-        input_meeting_date = row['Shareholder Meeting Date']
-        
-        # Look for matches in database
-        db_matches = db_lookup.get(refined_ticker, [])
-        
-        if db_matches:
-            ticker_matches += 1
-            df.at[index, 'Match_Method'] = 'Ticker'
-            df.at[index, 'Database_Company_Name'] = db_matches[0]['company_name']
-            
-            # Find the best matching meeting date
-            best_match = None
-            best_date_diff = float('inf')
-            
-            for match in db_matches:
-                if match['meeting_date']:
-                    try:
-                        input_date = pd.to_datetime(input_meeting_date)
-                        db_date = pd.to_datetime(match['meeting_date'])
-                        date_diff = abs((input_date - db_date).days)
-                        
-                        if date_diff < best_date_diff:
-                            best_date_diff = date_diff
-                            best_match = match
-                    except:
-                        continue
-            
-            if best_match:
-                df.at[index, 'Database_Meeting_Date'] = best_match['meeting_date']
-                df.at[index, 'Database_Proposal'] = best_match['proposal']
-                df.at[index, 'Date_Difference_Days'] = best_date_diff
-                
-                # Validate the meeting date with more flexible criteria
-                try:
-                    input_date = pd.to_datetime(input_meeting_date)
-                    db_date = pd.to_datetime(best_match['meeting_date'])
-                    
-                    if input_date == db_date:
-                        df.at[index, 'Validation_Status'] = '✅ Exact Match'
-                        df.at[index, 'Validation_Notes'] = 'Meeting dates match exactly'
-                        valid_count += 1
-                    elif best_date_diff <= 1:  # Within 1 day
-                        df.at[index, 'Validation_Status'] = '✅ Close Match'
-                        df.at[index, 'Validation_Notes'] = f'Dates very close: Input {input_date.strftime("%Y-%m-%d")}, DB {db_date.strftime("%Y-%m-%d")} (diff: {best_date_diff} days)'
-                        valid_count += 1
-                    elif best_date_diff <= 7:  # Within 1 week
-                        df.at[index, 'Validation_Status'] = '⚠️ Week Match'
-                        df.at[index, 'Validation_Notes'] = f'Dates within week: Input {input_date.strftime("%Y-%m-%d")}, DB {db_date.strftime("%Y-%m-%d")} (diff: {best_date_diff} days)'
-                        valid_count += 1
-                    elif best_date_diff <= 30:  # Within 1 month
-                        df.at[index, 'Validation_Status'] = '⚠️ Month Match'
-                        df.at[index, 'Validation_Notes'] = f'Dates within month: Input {input_date.strftime("%Y-%m-%d")}, DB {db_date.strftime("%Y-%m-%d")} (diff: {best_date_diff} days)'
-                        valid_count += 1
-                    else:
-                        df.at[index, 'Validation_Status'] = '❌ Large Difference'
-                        df.at[index, 'Validation_Notes'] = f'Dates differ significantly: Input {input_date.strftime("%Y-%m-%d")}, DB {db_date.strftime("%Y-%m-%d")} (diff: {best_date_diff} days)'
-                        invalid_count += 1
-                        
-                except Exception as e:
-                    df.at[index, 'Validation_Status'] = '⚠️ Date Error'
-                    df.at[index, 'Validation_Notes'] = f'Date parsing error: {str(e)}'
-                    invalid_count += 1
-            else:
-                df.at[index, 'Validation_Status'] = '⚠️ No Meeting Date'
-                df.at[index, 'Validation_Notes'] = 'Company found but no meeting date in database'
-                not_found_count += 1
-        else:
-            df.at[index, 'Validation_Status'] = '🔍 Not Found'
-            df.at[index, 'Validation_Notes'] = f'Ticker "{refined_ticker}" not found in database'
-            not_found_count += 1
+    company_names = np.array([entry['company_name'] for entry in db_lookup.values()] + [None], dtype=object)
+    
+    # Add validation columns
+    df['Validation_Status'] = statuses
+    df['Database_Meeting_Date'] = db_meeting_date.to_numpy()
+    df['Database_Company_Name'] = company_names[ticker_codes]  # code -1 picks the trailing None
+    df['Database_Proposal'] = db_proposal.to_numpy()
+    df['Match_Method'] = np.where(found, 'Ticker', None)
+    df['Validation_Notes'] = notes
+    df['Date_Difference_Days'] = pd.array(diff_days.to_numpy(), dtype='Int64')
+    apply_schema(df, MEETING_VALIDATION_SCHEMA)
+    
+    print_validation_summary(df)
+    
+    return df
+
+def print_validation_summary(df):
+    """Status and match-method counts of a validated frame"""
+    statuses = df['Validation_Status']
+    not_found_count = int(statuses.isin(['🔍 Not Found', '⚠️ No Meeting Date']).sum())
+    ticker_matches = int((df['Match_Method'] == 'Ticker').sum())
     
-    # Print validation summary
     print(f"\n📊 Validation Summary:")
-    print(f"   ✅ Exact Match: {len(df[df['Validation_Status'] == '✅ Exact Match'])}")
-    print(f"   ✅ Close Match: {len(df[df['Validation_Status'] == '✅ Close Match'])}")
-    print(f"   ⚠️ Week Match: {len(df[df['Validation_Status'] == '⚠️ Week Match'])}")
-    print(f"   ⚠️ Month Match: {len(df[df['Validation_Status'] == '⚠️ Month Match'])}")
-    print(f"   ❌ Large Difference: {len(df[df['Validation_Status'] == '❌ Large Difference'])}")
+    print(f"   ✅ Exact Match: {len(df[statuses == '✅ Exact Match'])}")
+    print(f"   ✅ Close Match: {len(df[statuses == '✅ Close Match'])}")
+    print(f"   ⚠️ Week Match: {len(df[statuses == '⚠️ Week Match'])}")
+    print(f"   ⚠️ Month Match: {len(df[statuses == '⚠️ Month Match'])}")
+    print(f"   ❌ Large Difference: {len(df[statuses == '❌ Large Difference'])}")
     print(f"   🔍 Not Found: {not_found_count}")
     print(f"   📈 Total: {len(df)}")
     print(f"\n🔍 Match Methods:")
     print(f"   🎯 Ticker Matches: {ticker_matches}")
-    
-    return df
+
+def meetings_frame(db_lookup):
+    """db_lookup flattened to one row per meeting (a row of nulls for companies without one).
+
+    This is the reference data shipped to parallel_validation workers;
+    proposals are left out because validation never reads them.
+    """
+    rows = []
+    for symbol, entry in db_lookup.items():
+        for m in entry['meetings'] or [{}]:
+            rows.append((symbol, entry['company_name'], m.get('meeting_date'), m.get('meeting_type'),
+                         m.get('proposal'), m.get('proposal_num')))
+    return pd.DataFrame(rows, columns=['symbol', 'company_name', 'meeting_date', 'meeting_type',
+                                       'proposal', 'proposal_num'])
+
+def lookup_from_meetings(meetings_df):
+    """Rebuild the db_lookup shape (without proposals) from meetings_frame rows, keeping their order"""
+    db_lookup = {}
+    for symbol, company_name, meeting_date, meeting_type, proposal, proposal_num in meetings_df.itertuples(index=False):
+        entry = db_lookup.setdefault(symbol, {'company_name': company_name, 'meetings': [], 'proposals': []})
+        if not pd.isna(meeting_date):
+            entry['meetings'].append({
+                'meeting_date': meeting_date,
+                'meeting_type': meeting_type,
+                'proposal': proposal,
+                'proposal_num': proposal_num,
+            })
+    return db_lookup
+
+def validate_meetings_shard(df, meetings_df):
+    """validate_shareholder_meetings for one ticker shard (runs in a parallel_validation worker)"""
+    return validate_shareholder_meetings(df, lookup_from_meetings(meetings_df))
 
 def main():
     print("🚀 Starting shareholder meeting validation process...")
@@ -250,12 +356,10 @@ def main():
     try:
         # Load Excel file
         print(f"\n📁 Loading input file: {input_file}")
-        df = pd.read_excel(input_file)
+        # Refined_Ticker: tickers with "-US" etc. removed
+        df = read_input_workbook(input_file, normalized_ticker_column='Refined_Ticker')
         print(f"✅ Loaded {len(df)} records from input file")
         
-        # Remove "-US" from tickers
-        df['Refined_Ticker'] = df['Ticker'].str.replace('-US', '', regex=False).str.replace('-us', '', regex=False).str.strip()
-        
         # Filter to only include records with valid tickers
         df = df[df['Refined_Ticker'].notna() & (df['Refined_Ticker'] != '')]
         print(f"🔧 After ticker refinement: {len(df)} records")
@@ -265,16 +369,25 @@ def main():
         print(f"\n🎯 Unique tickers to query ({len(tickers)}): {tickers[:10]}...")
         
         # Query database
-        db_results = fetch_company_data_by_ticker(conn, tickers)
+        if '--benchmark' in sys.argv:
+            benchmark_fetch(conn, tickers)
+        
+        db_lookup = fetch_company_data_by_ticker(conn, tickers)
         
-        if db_results:
-            print(f"\n✅ Successfully retrieved {len(db_results)} records from database")
+        if db_lookup:
+            print(f"\n✅ Successfully retrieved {len(db_lookup)} companies from database")
             
             # Analyze date patterns first
-            analyze_date_patterns(df, db_results)
+            analyze_date_patterns(df, db_lookup)
             
             # Validate the data
-            validated_df = validate_shareholder_meetings(df, db_results)
+            if PARALLEL_VALIDATION:
+                meetings_df = meetings_frame(db_lookup)
+                validated_df = run_sharded(validate_meetings_shard, df, df['Refined_Ticker'],
+                                           meetings_df, meetings_df['symbol'])
+                print_validation_summary(validated_df)
+            else:
+                validated_df = validate_shareholder_meetings(df, db_lookup)
             
             # Save results
             print(f"\n💾 Saving results to: {output_file}")
@@ -296,8 +409,8 @@ def main():
     
     finally:
         if conn:
-            conn.close()
-            print("\n🔌 Database connection closed")
+            release_connection(conn)
+            print("\n🔌 Database connection released")
 
 if __name__ == "__main__":
     main()
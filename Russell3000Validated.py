@@ -1,17 +1,25 @@
+import sys
+
 import pandas as pd
-import psycopg2
 from datetime import datetime
 
+from db import connection
+from input_workbook import read_input_workbook
+from meeting_calendar import MeetingCalendar
+from query_cache import QueryCache, cached_query
+from ticker_set import ticker_array
+
 # --- Config ---
 input_file = "Russell3000 Feb 2025(Upcoming shareholder meeting).xlsx"
 output_file = "Company_Meeting_Match_Summary.xlsx"
+# Serve unchanged query results from the local result cache (run with --refresh to re-query)
+USE_QUERY_CACHE = True
+FORCE_REFRESH = '--refresh' in sys.argv
 
-DB_CONFIG = {
-    #   // Please Add DB Creds
-}
 
 # --- Load Excel ---
-df_input = pd.read_excel(input_file)
+# clean_ticker: upper-cased, "-US" removed, known aliases applied (other suffixes such as -CA are kept)
+df_input = read_input_workbook(input_file, normalized_ticker_column="clean_ticker")
 today = pd.Timestamp.today().normalize()
 start_date = pd.Timestamp("2025-01-01")
 
@@ -19,17 +27,13 @@ start_date = pd.Timestamp("2025-01-01")
 date_col = "Shareholder Meeting date (no code)"
 df_input[date_col] = pd.to_datetime(df_input[date_col], errors="coerce")
 
-# Clean tickers: remove "-US" or any "-XXX"
-df_input["clean_ticker"] = df_input["Ticker"].str.replace(r"-[A-Z]+$", "", regex=True)
-
 # Use clean tickers for DB query
 tickers = df_input["clean_ticker"].dropna().unique().tolist()
 print(f"Tickers to query (cleaned, {len(tickers)}): {tickers[:10]}...")
 
 
 # --- Query DB ---
-placeholders = ', '.join(['%s'] * len(tickers))
-query = f"""
+query = """
 SELECT 
     c.symbol,
     c."name",
@@ -38,11 +42,12 @@ FROM public.company c
 JOIN public.home_meeting_details hmd 
     ON c.id = hmd.company_id
 WHERE hmd.year = 2025
-  AND c.symbol IN ({placeholders})
+  AND c.symbol = ANY(%s)
 """
 
-with psycopg2.connect(**DB_CONFIG) as conn:
-    df_db = pd.read_sql(query, conn, params=tickers)
+with connection() as conn:
+    cache = QueryCache(refresh=FORCE_REFRESH) if USE_QUERY_CACHE else None
+    df_db = cached_query(conn, query, ticker_array(tickers), cache=cache)
 
 df_db['meeting_date'] = pd.to_datetime(df_db['meeting_date'], errors="coerce")
 
@@ -57,22 +62,14 @@ df_merged["matched"] = df_merged["_merge"] == "both"
 
 
 # --- Add Match Columns ---
-def check_meeting_match(row):
-    """Check if DB and Input meeting dates match between Jan 1 2025 and today."""
-    if pd.isna(row['meeting_date']) or pd.isna(row[date_col]):
-        return False
-    if start_date <= row['meeting_date'] <= today:
-        return row['meeting_date'].date() == row[date_col].date()
-    return False
-
-def check_upcoming(row):
-    """Check if DB meeting date is after today."""
-    if pd.isna(row['meeting_date']):
-        return False
-    return row['meeting_date'] > today
-
-df_merged["Meeting_Date_Match"] = df_merged.apply(check_meeting_match, axis=1)
-df_merged["Upcoming_Meeting"] = df_merged.apply(check_upcoming, axis=1)
+calendar = MeetingCalendar.from_frame(df_merged, 'meeting_date')
+
+# DB and input meeting dates match (same day) for DB meetings between Jan 1 2025 and today
+same_day = (df_merged['meeting_date'].dt.normalize() == df_merged[date_col].dt.normalize()).to_numpy()
+df_merged["Meeting_Date_Match"] = calendar.mask(start_date, today, inclusive='both') & same_day
+
+# DB meeting date is after today
+df_merged["Upcoming_Meeting"] = calendar.mask(start=today, inclusive='neither')
 
 # --- Summary ---
 total_input = len(df_input)
@@ -1,16 +1,10 @@
-import psycopg2
-
-# Database credentials
-DB_CONFIG = {
-    #    // Please Add DB Creds
-}
+from db import get_connection, release_connection
 
 def check_table_columns():
     """Check what columns are available in the sp_def14a table"""
     
     try:
-        conn = psycopg2.connect(**DB_CONFIG)
-        conn.autocommit = True
+        conn = get_connection()
         cursor = conn.cursor()
         
         # Check columns in sp_def14a table
@@ -73,7 +67,7 @@ def check_table_columns():
             print("   No data found for 2025")
         
         cursor.close()
-        conn.close()
+        release_connection(conn)
         
     except Exception as e:
         print(f"❌ Error: {e}")
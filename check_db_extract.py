@@ -0,0 +1,70 @@
+"""Check that COPY and sharded extracts to .xlsx roll over Excel's row limit instead of failing.
+
+Runs generated rows (generate_series, no tables touched) through the configured
+database. Excel's limit is lowered for the run so the rollover shows up in seconds.
+
+Run: python check_db_extract.py
+"""
+import contextlib
+import io
+import os
+import tempfile
+
+from openpyxl import load_workbook
+
+import db_extract
+from db_extract import copy_export, sharded_export
+
+SHEET_ROWS = 1000                # Excel row limit for the check, header included
+ROWS = 2500                      # data rows: two full sheets plus a partial one
+
+QUERY = f"""
+    SELECT g AS id, 2024 + g % 2 AS year, CASE WHEN g % 3 = 0 THEN 'USA' ELSE 'Canada' END AS country,
+           'Proposal ' || g AS proposal, (g % 100) / 4.0 AS support, DATE '2025-01-01' + g % 365 AS meeting_date
+    FROM generate_series(1, {ROWS}) AS g
+"""
+
+
+def xlsx_rows(path):
+    """Data rows per sheet, and all data rows in sheet order"""
+    workbook = load_workbook(path, read_only=True)
+    per_sheet, rows = [], []
+    for sheet in workbook.worksheets:
+        values = list(sheet.iter_rows(values_only=True))[1:]
+        per_sheet.append(len(values))
+        rows.extend(values)
+    workbook.close()
+    return per_sheet, rows
+
+
+def check_copy_export_xlsx(directory):
+    path = os.path.join(directory, 'copy.xlsx')
+    with contextlib.redirect_stdout(io.StringIO()):
+        written = copy_export(QUERY, path)
+    per_sheet, rows = xlsx_rows(path)
+    assert written == ROWS and per_sheet == [999, 999, 502], f"{written} rows written, sheets hold {per_sheet}"
+    assert [row[0] for row in rows] == list(range(1, ROWS + 1)), "rows lost, duplicated or reordered across sheets"
+    print(f"✅ copy_export to .xlsx: {written:,} rows split over sheets of {per_sheet}")
+
+
+def check_sharded_export_xlsx(directory):
+    path = os.path.join(directory, 'sharded.xlsx')
+    ids = f"(SELECT generate_series(1, {ROWS}) AS id) AS ids"   # id ranges come from the generated rows
+    with contextlib.redirect_stdout(io.StringIO()):
+        written = sharded_export(QUERY, path, years=(2024, 2025), workers=2, id_table=ids)
+    per_sheet, rows = xlsx_rows(path)
+    assert written == ROWS and per_sheet == [999, 999, 502], f"{written} rows written, sheets hold {per_sheet}"
+    assert sorted(row[0] for row in rows) == list(range(1, ROWS + 1)), "rows lost or duplicated across sheets"
+    print(f"✅ sharded_export to .xlsx: {written:,} rows split over sheets of {per_sheet}")
+
+
+def main():
+    db_extract.EXCEL_MAX_ROWS = SHEET_ROWS
+    with tempfile.TemporaryDirectory() as directory:
+        check_copy_export_xlsx(directory)
+        check_sharded_export_xlsx(directory)
+    print("🎉 Extract checks passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Check incremental def14a sync against a local stub API (no network, no real store).
+
+Run: python check_proposal_sync.py
+"""
+import contextlib
+import io
+import os
+import tempfile
+
+import proposal_sync
+from proposal_sync import ProposalStore, sync_proposals
+from zmh_api import create_session
+from zmh_cache import ResponseCache
+from zmh_stub import StubAPI
+
+
+def make_record(record_id):
+    return {'id': record_id, 'updated_at': f"2025-01-01T00:{record_id // 60:02d}:{record_id % 60:02d}",
+            'proposal_name': f"Proposal {record_id}"}
+
+
+def check_new_record_between_syncs(updated_field):
+    """A record added after a sync must be in the store after the next one, with the response cache on"""
+    original = proposal_sync.UPDATED_FIELD
+    proposal_sync.UPDATED_FIELD = updated_field
+    try:
+        with tempfile.TemporaryDirectory() as directory, StubAPI([make_record(i) for i in range(1, 97)]) as api:
+            cache = ResponseCache(os.path.join(directory, 'responses.sqlite3'))
+            store = ProposalStore(os.path.join(directory, 'proposals.sqlite3'))
+            session = create_session(4, cache=cache)
+            with contextlib.redirect_stdout(io.StringIO()):
+                sync_proposals(store, api.url, {}, session, max_workers=4)   # full sync
+                sync_proposals(store, api.url, {}, session, max_workers=4)   # nothing new
+                api.records.append(make_record(97))
+                sync_proposals(store, api.url, {}, session, max_workers=4)
+            count = store.count()
+            store.close()
+            cache.close()
+    finally:
+        proposal_sync.UPDATED_FIELD = original
+    mode = f"{updated_field} watermark" if updated_field else "max-id fallback"
+    assert count == 97, f"{mode}: store has {count} records after the third sync, expected 97"
+    print(f"✅ {mode}: record added between syncs is stored ({count} records)")
+
+
+def check_ignored_id_ordering():
+    """The max-id fallback must still find new records when the API ignores ?ordering=-id"""
+    original = proposal_sync.UPDATED_FIELD
+    proposal_sync.UPDATED_FIELD = None
+    try:
+        with tempfile.TemporaryDirectory() as directory, StubAPI([make_record(i) for i in range(1, 97)]) as api:
+            store = ProposalStore(os.path.join(directory, 'proposals.sqlite3'))
+            session = create_session(4)
+            with contextlib.redirect_stdout(io.StringIO()) as output:
+                sync_proposals(store, api.url, {}, session, max_workers=4)
+                api.ignore_ordering = True
+                api.records.append(make_record(97))
+                fetched = sync_proposals(store, api.url, {}, session, max_workers=4)
+            count = store.count()
+            store.close()
+    finally:
+        proposal_sync.UPDATED_FIELD = original
+    assert count == 97 and fetched == 1, f"store has {count} records ({fetched} fetched), expected 97 (1 fetched)"
+    assert "API ignored ordering=-id" in output.getvalue(), "ignored ordering was not reported"
+    print(f"✅ max-id fallback with ordering ignored: warned, walked every page, {count} records")
+
+
+def main():
+    check_new_record_between_syncs('updated_at')
+    check_new_record_between_syncs(None)
+    check_ignored_id_ordering()
+    print("🎉 Proposal sync checks passed")
+
+
+if __name__ == "__main__":
+    main()
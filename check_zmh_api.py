@@ -0,0 +1,64 @@
+"""Check concurrent page fetching against a local stub API (no network).
+
+Run: python check_zmh_api.py
+"""
+import contextlib
+import io
+
+import zmh_resilience
+from zmh_api import IncompletePagesError, create_session, fetch_all_pages
+from zmh_stub import StubAPI
+
+RECORDS = 250
+PAGE_SIZE = 10
+
+
+def make_records():
+    return [{'id': record_id, 'updated_at': f"2025-01-01T{record_id:08d}"} for record_id in range(1, RECORDS + 1)]
+
+
+def check_complete_in_order_despite_429s():
+    with StubAPI(make_records(), page_size=PAGE_SIZE) as api:
+        api.retry_after = 0
+        for page in (2, 5, 13, 25):
+            api.fail_page(page, 429, 429)
+        with contextlib.redirect_stdout(io.StringIO()):
+            results = fetch_all_pages(api.url, {}, max_workers=4, session=create_session(4))
+        requests_made = len(api.requests)
+    ids = [record['id'] for record in results]
+    assert ids == list(range(1, RECORDS + 1)), "records missing, duplicated or out of page order"
+    assert requests_made == RECORDS // PAGE_SIZE + 8, f"expected 8 retried 429s, saw {requests_made} requests"
+    print(f"✅ 429s retried: {len(ids)} records in page order, no duplicates ({requests_made} requests)")
+
+
+def check_failed_page_is_reported():
+    with StubAPI(make_records(), page_size=PAGE_SIZE) as api:
+        api.retry_after = 0
+        api.fail_page(7, *[429] * (zmh_resilience.MAX_RETRIES + 1))
+        with contextlib.redirect_stdout(io.StringIO()):
+            try:
+                fetch_all_pages(api.url, {}, max_workers=4, session=create_session(4))
+            except IncompletePagesError as e:
+                error = e
+            else:
+                error = None
+        assert error is not None, "strict fetch_all_pages returned despite a failed page"
+        assert error.failed_pages == [7], f"failed pages reported as {error.failed_pages}"
+        assert len(error.results) == RECORDS - PAGE_SIZE
+
+        api.fail_page(7, *[429] * (zmh_resilience.MAX_RETRIES + 1))
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            results = fetch_all_pages(api.url, {}, max_workers=4, session=create_session(4), strict=False)
+    assert len(results) == RECORDS - PAGE_SIZE and 'page(s) failed ([7])' in output.getvalue()
+    print("✅ Page failing every retry: strict raises IncompletePagesError([7]), strict=False warns")
+
+
+def main():
+    zmh_resilience.BACKOFF_BASE = 0.01   # keep retries fast against the stub
+    check_complete_in_order_despite_429s()
+    check_failed_page_is_reported()
+    print("🎉 API fetch checks passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""Check Retry-After handling, the circuit breaker and the token bucket against a local stub API.
+
+Run: python check_zmh_resilience.py
+"""
+import contextlib
+import io
+import time
+from email.utils import formatdate
+
+import requests
+
+import zmh_resilience
+from zmh_api import create_session, send_request
+from zmh_resilience import CircuitBreaker, CircuitOpenError, TokenBucket, retry_after_seconds
+from zmh_stub import StubAPI
+
+
+def check_retry_after():
+    with StubAPI([{'id': 1}]) as api:
+        api.retry_after = 1
+        api.fail_page(1, 429)
+        session = create_session(1)
+        start = time.monotonic()
+        response = send_request(session, api.url, {})
+        waited = time.monotonic() - start
+        assert response.status_code == 200 and len(api.requests) == 2
+        assert waited >= 1.0, f"retried after {waited:.2f}s, before Retry-After"
+        assert session.rate_limiter.rate < session.rate_limiter.max_rate, "429 did not throttle the limiter"
+
+        # Header parsing: seconds, HTTP date, cap
+        for header, low, high in (('7', 7, 7), (formatdate(time.time() + 30, usegmt=True), 28, 30),
+                                  ('100000', zmh_resilience.RETRY_AFTER_CAP, zmh_resilience.RETRY_AFTER_CAP)):
+            api.retry_after = header
+            api.fail_page(1, 429)
+            seconds = retry_after_seconds(requests.get(api.url))
+            assert low <= seconds <= high, f"Retry-After {header!r} parsed as {seconds}"
+    print(f"✅ Retry-After: 429 retried after {waited:.2f}s and throttled the limiter; "
+          f"seconds, HTTP dates and the cap parse")
+
+
+def check_circuit_breaker():
+    with StubAPI([{'id': 1}]) as api:
+        session = create_session(1)
+        session.circuit_breaker = CircuitBreaker(threshold=3, cooldown=0.3)
+        api.down = True
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            # Closed -> open after threshold consecutive 503s
+            try:
+                send_request(session, api.url, {})
+                raise AssertionError("no CircuitOpenError while the server is down")
+            except CircuitOpenError:
+                pass
+            assert len(api.requests) == 3, f"{len(api.requests)} requests before the circuit opened"
+
+            # Open: fail fast without touching the server
+            try:
+                send_request(session, api.url, {})
+                raise AssertionError("request sent while the circuit is open")
+            except CircuitOpenError:
+                pass
+            assert len(api.requests) == 3
+
+            # Half-open after the cooldown: one trial; its failure re-opens the circuit
+            time.sleep(0.35)
+            breaker = session.circuit_breaker
+            assert breaker.allow() and not breaker.allow(), "half-open let more than one trial through"
+            breaker.record_failure()
+            assert not breaker.allow(), "failed trial did not re-open the circuit"
+
+            # Half-open trial succeeds -> closed
+            time.sleep(0.35)
+            api.down = False
+            response = send_request(session, api.url, {})
+        assert response.status_code == 200 and len(api.requests) == 4
+        assert all(breaker.allow() for _ in range(5)), "circuit not closed after a successful trial"
+    print("✅ Circuit breaker: opens after 3 failures, fails fast, one half-open trial, closes on success")
+
+
+def open_breaker(session, api):
+    """Trip the session's breaker against a down stub and wait out its cooldown (half-open)"""
+    api.down = True
+    with contextlib.redirect_stdout(io.StringIO()):
+        try:
+            send_request(session, api.url, {})
+        except CircuitOpenError:
+            pass
+    api.down = False
+    time.sleep(0.35)
+
+
+def check_half_open_trial_released():
+    with StubAPI([{'id': 1}]) as api:
+        session = create_session(1)
+        breaker = session.circuit_breaker = CircuitBreaker(threshold=3, cooldown=0.3)
+
+        # A 429 on the half-open trial is not a failure: the trial slot is freed and the retry closes the circuit
+        open_breaker(session, api)
+        api.retry_after = 0
+        api.fail_page(1, 429)
+        requests_before = len(api.requests)
+        response = send_request(session, api.url, {})
+        assert response.status_code == 200 and len(api.requests) == requests_before + 2
+        assert not breaker._trial_in_flight and all(breaker.allow() for _ in range(5)), \
+            "429 during half-open left the circuit stuck open"
+
+        # Neither does an error raised by the request itself
+        open_breaker(session, api)
+        try:
+            send_request(session, 'unsupported://stub/', {})
+            raise AssertionError("request to an unsupported scheme did not raise")
+        except requests.exceptions.InvalidSchema:
+            pass
+        assert breaker.allow(), "error during half-open left the trial slot claimed"
+    print("✅ Half-open trial: a 429 or a local request error frees the trial slot")
+
+
+def check_token_bucket():
+    bucket = TokenBucket(rate=20, burst=5)
+    start = time.monotonic()
+    for _ in range(5):
+        bucket.acquire()
+    burst = time.monotonic() - start
+    for _ in range(10):
+        bucket.acquire()
+    paced = time.monotonic() - start - burst
+    assert burst < 0.05, f"burst of 5 took {burst:.3f}s"
+    assert 0.45 <= paced <= 0.7, f"10 tokens at 20/s took {paced:.3f}s"
+
+    bucket.throttle()
+    assert bucket.rate == 10
+    for _ in range(20):
+        bucket.throttle()
+    assert bucket.rate == zmh_resilience.MIN_RATE, "throttle went below MIN_RATE"
+    for _ in range(100):
+        bucket.recover()
+    assert bucket.rate == bucket.max_rate, "recover overshot or did not reach the configured rate"
+    print(f"✅ Token bucket: burst of 5 in {burst * 1000:.0f} ms, 10 more at 20/s in {paced:.2f}s, "
+          f"throttle/recover stay within [MIN_RATE, rate]")
+
+
+def main():
+    zmh_resilience.BACKOFF_BASE = 0.01   # keep backoff retries fast against the stub
+    check_retry_after()
+    check_circuit_breaker()
+    check_half_open_trial_released()
+    check_token_bucket()
+    print("🎉 Resilience checks passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+
+def _text(value):
+    """str(value), with None/NaN/NA (but not list or dict values) kept missing"""
+    if value is None or value is pd.NA or (isinstance(value, float) and value != value):
+        return None
+    return str(value)
+
+
+class ParquetBatchWriter:
+    """Append batches of JSON records to a Parquet file as they arrive.
+
+    The schema is fixed by the first non-empty batch. All-null columns are
+    stored as strings and integer columns as float64, since JSON numbers
+    that were whole in the first batch can carry decimals later. Later
+    batches are conformed to it: missing columns become nulls, unknown
+    columns are dropped with a warning, and values the column's type can't
+    hold are written as nulls with a warning rather than failing the file
+    halfway. Only one batch is held in memory at a time.
+    """
+
+    def __init__(self, path, transform=None):
+        self.path = path
+        self.transform = transform
+        self.rows_written = 0
+        self._writer = None
+        self._schema = None
+        self._dropped = set()
+
+    def write_records(self, records):
+        """Convert one batch of dicts to a columnar table and append it"""
+        if not records:
+            return 0
+
+        df = pd.DataFrame.from_records(records)
+        if self.transform is not None:
+            df = self.transform(df)
+        table = self._to_table(df)
+
+        if self._writer is None:
+            self._schema = pa.schema([self._widen(field) for field in table.schema])
+            self._writer = pq.ParquetWriter(self.path, self._schema)
+
+        self._writer.write_table(self._conform(table))
+        self.rows_written += len(df)
+        return len(df)
+
+    @staticmethod
+    def _to_table(df):
+        """The batch as an Arrow table; columns mixing numbers and text within the batch are kept as text"""
+        try:
+            return pa.Table.from_pandas(df, preserve_index=False)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            pass
+        df = df.copy()
+        for name in df.columns:
+            try:
+                pa.array(df[name], from_pandas=True)
+            except (pa.ArrowInvalid, pa.ArrowTypeError):
+                df[name] = df[name].map(_text).astype(object)
+        return pa.Table.from_pandas(df, preserve_index=False)
+
+    @staticmethod
+    def _widen(field):
+        if pa.types.is_null(field.type):
+            return field.with_type(pa.string())
+        if pa.types.is_integer(field.type):
+            return field.with_type(pa.float64())
+        return field
+
+    def _conform(self, table):
+        """Reorder, fill and cast a batch's columns to the file schema"""
+        extra = set(table.column_names) - set(self._schema.names) - self._dropped
+        if extra:
+            print(f"⚠️ Dropping columns not present in the first batch: {sorted(extra)}")
+            self._dropped |= extra
+
+        columns = []
+        for field in self._schema:
+            if field.name not in table.column_names:
+                columns.append(pa.nulls(len(table), type=field.type))
+                continue
+            column = table.column(field.name)
+            if column.type != field.type:
+                if pa.types.is_string(field.type) and not pa.types.is_null(column.type):
+                    column = pa.array(column.to_pandas().map(_text), type=pa.string())
+                else:
+                    try:
+                        column = column.cast(field.type)
+                    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+                        column = self._cast_values(column, field)
+            columns.append(column)
+        return pa.Table.from_arrays(columns, schema=self._schema)
+
+    @staticmethod
+    def _cast_values(column, field):
+        """Cast value by value; values the field's type can't hold become nulls"""
+        values = []
+        lost = 0
+        for value in column.to_pylist():
+            try:
+                values.append(None if value is None else pa.scalar(value, type=field.type).as_py())
+            except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError, TypeError, ValueError):
+                values.append(None)
+                lost += 1
+        if lost:
+            print(f"⚠️ Column {field.name}: {lost} value(s) can't be stored as {field.type} and were written as nulls")
+        return pa.array(values, type=field.type)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def parquet_to_excel(parquet_path, excel_path):
+    """Export a Parquet file produced by ParquetBatchWriter to Excel"""
+    df = pd.read_parquet(parquet_path)
+    df.to_excel(excel_path, index=False)
+    return len(df)
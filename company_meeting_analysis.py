@@ -1,34 +1,52 @@
+import contextlib
+import io
+import sys
+import time
+
+import numpy as np
 import pandas as pd
-import psycopg2
 from datetime import datetime, date
 import warnings
 warnings.filterwarnings('ignore')
 
-# ===== CONFIGURATION =====
-# Database credentials
-DB_CONFIG = {
-    #    // Please Add DB Creds
-}
+from db import get_connection, release_connection
+from input_workbook import read_input_workbook
+from meeting_calendar import MeetingCalendar
+from parallel_validation import run_sharded
+from query_cache import QueryCache, cached_query
+from report_writer import StreamingReportWriter
+from ticker_normalize import normalize_tickers
+from validation_schema import COMPANY_MEETING_MISSING, COMPANY_MEETING_SCHEMA, apply_schema
 
+# ===== CONFIGURATION =====
 # Input and output files
 input_file = "Russell3000 Feb 2025(Upcoming shareholder meeting).xlsx"
 output_file = "Company_Meeting_Analysis_2025.xlsx"
 
+# Serve unchanged query results from the local result cache (run with --refresh to re-query)
+USE_QUERY_CACHE = True
+FORCE_REFRESH = '--refresh' in sys.argv
+
+# Analyze large inputs in ticker-hash shards across worker processes (run with --parallel)
+PARALLEL_VALIDATION = '--parallel' in sys.argv
+
 def connect_to_db():
-    """Establish database connection"""
+    """Check out a pooled database connection"""
     try:
-        conn = psycopg2.connect(**DB_CONFIG)
-        conn.autocommit = True
-        return conn
+        return get_connection()
     except Exception as e:
         print(f"❌ Database connection failed: {e}")
         return None
 
+# Columns this report reads from the sp_def14a fetch (report_pipeline fetches their union once)
+DB_COLUMNS = [
+    'company_id', 'company_name', 'company_ticker', 'country', 'filing_date', 'proposal_name',
+    'category', 'sub_category', 'vote_outcome', 'percentage_support',
+]
+
 def fetch_db_companies(conn):
     """Fetch all companies from database for 2025"""
     try:
-        cursor = conn.cursor()
-        
         # Query to get all companies with 2025 data
         query = """
             SELECT DISTINCT
@@ -48,14 +66,8 @@ def fetch_db_companies(conn):
             ORDER BY c.symbol;
         """
         
-        cursor.execute(query)
-        results = cursor.fetchall()
-        
-        # Convert to DataFrame
-        columns = [desc[0] for desc in cursor.description]
-        db_df = pd.DataFrame(results, columns=columns)
-        
-        cursor.close()
+        cache = QueryCache(refresh=FORCE_REFRESH) if USE_QUERY_CACHE else None
+        db_df = cached_query(conn, query, cache=cache)
         return db_df
         
     except Exception as e:
@@ -66,116 +78,154 @@ def read_input_file():
     """Read the input Excel file"""
     try:
         print(f"📖 Reading input file: {input_file}")
-        input_df = pd.read_excel(input_file)
+        input_df = read_input_workbook(input_file)
         print(f"✅ Loaded {len(input_df)} records from input file")
         return input_df
     except Exception as e:
         print(f"❌ Error reading input file: {e}")
         return None
 
-def clean_ticker(ticker):
-    """Clean ticker symbol (remove -US suffix and convert to uppercase)"""
-    if pd.isna(ticker):
-        return None
-    return str(ticker).replace('-US', '').replace('-CA', '').strip().upper()
-
 def analyze_companies(input_df, db_df):
     """Analyze companies from input file against database"""
     
     print("\n🔍 Analyzing companies...")
     
     # Clean tickers in both datasets
-    input_df['clean_ticker'] = input_df['Ticker'].apply(clean_ticker)
-    db_df['clean_ticker'] = db_df['company_ticker'].apply(clean_ticker)
+    input_df['clean_ticker'] = normalize_tickers(input_df['Ticker'])
+    db_df['clean_ticker'] = normalize_tickers(db_df['company_ticker'])
     
-    # Create analysis results
-    analysis_results = []
+    # Per ticker: number of DB rows and the first row's attributes
+    db_rows = db_df[db_df['clean_ticker'].notna()]
+    ticker_index = (db_rows.drop_duplicates('clean_ticker')
+                    [['clean_ticker', 'company_name', 'company_id', 'filing_date', 'category']]
+                    .astype(object))
+    ticker_index['proposal_count'] = ticker_index['clean_ticker'].map(db_rows.groupby('clean_ticker').size())
     
-    for idx, row in input_df.iterrows():
-        company_name = row.get('Company', 'N/A')
-        ticker = row.get('Ticker', 'N/A')
-        ticker_clean = row.get('clean_ticker', 'N/A')
-        meeting_date = row.get('Shareholder Meeting Date')
-        last_meeting_date = row.get('Last shareholder meeting date')
-        
-        # Find matching company in database
-        db_match = db_df[db_df['clean_ticker'] == ticker_clean]
-        
-        # Determine meeting status
-        if pd.notna(meeting_date):
-            meeting_date = pd.to_datetime(meeting_date, errors='coerce')
-            if pd.notna(meeting_date):
-                current_date = date.today()
-                if meeting_date.date() <= current_date:
-                    meeting_status = 'Past'
-                    days_info = f"{(current_date - meeting_date.date()).days} days ago"
-                else:
-                    meeting_status = 'Upcoming'
-                    days_info = f"in {(meeting_date.date() - current_date).days} days"
-            else:
-                meeting_status = 'Invalid Date'
-                days_info = 'N/A'
-        else:
-            meeting_status = 'No Date'
-            days_info = 'N/A'
-        
-        analysis_result = {
-            'Company': company_name,
-            'Ticker': ticker,
-            'Clean_Ticker': clean_ticker,
-            'Shareholder_Meeting_Date': meeting_date,
-            'Last_Shareholder_Meeting_Date': last_meeting_date,
-            'Meeting_Status': meeting_status,
-            'Days_Info': days_info,
-            'DB_Found': 'Yes' if len(db_match) > 0 else 'No',
-            'DB_Company_Name': db_match['company_name'].iloc[0] if len(db_match) > 0 else 'N/A',
-            'DB_Company_ID': db_match['company_id'].iloc[0] if len(db_match) > 0 else 'N/A',
-            'DB_Filing_Date': db_match['filing_date'].iloc[0] if len(db_match) > 0 else 'N/A',
-            'DB_Proposal_Count': len(db_match),
-            'DB_Category': db_match['category'].iloc[0] if len(db_match) > 0 else 'N/A',
-            'Notes': ''
-        }
-        
-        # Add specific notes
-        if len(db_match) == 0:
-            analysis_result['Notes'] = 'Company not found in database'
-        elif len(db_match) > 0:
-            if meeting_status == 'Past':
-                analysis_result['Notes'] = 'Meeting already held - check database for results'
-            elif meeting_status == 'Upcoming':
-                analysis_result['Notes'] = 'Upcoming meeting - monitor for updates'
-            else:
-                analysis_result['Notes'] = 'Date validation needed'
-        
-        analysis_results.append(analysis_result)
+    matched = pd.DataFrame({'clean_ticker': input_df['clean_ticker'].astype(object).to_numpy()}).merge(
+        ticker_index, on='clean_ticker', how='left')
+    found = matched['proposal_count'].notna()
+    
+    def input_column(name, default=None):
+        return input_df[name].to_numpy() if name in input_df.columns else default
+    
+    def db_column(name):
+        return matched[name].where(found).to_numpy()
+    
+    # Determine meeting status
+    raw_dates = pd.Series(input_column('Shareholder Meeting Date'), index=matched.index)
+    # format='mixed' parses each value on its own, as the old per-row loop did; a single inferred format NaTs the rest
+    meeting_dates = pd.to_datetime(raw_dates, errors='coerce', format='mixed')
+    today = pd.Timestamp(date.today())
+    days = (meeting_dates.dt.normalize() - today).dt.days
+    is_past = (days <= 0).to_numpy()
+    has_date = meeting_dates.notna().to_numpy()
     
-    return pd.DataFrame(analysis_results)
+    meeting_status = np.select(
+        [raw_dates.isna().to_numpy(), ~has_date, is_past],
+        ['No Date', 'Invalid Date', 'Past'],
+        'Upcoming',
+    )
+    days_text = days.abs().astype('Int64').astype(str)
+    days_info = np.select(
+        [~has_date, is_past],
+        ['N/A', (days_text + ' days ago').to_numpy()],
+        ('in ' + days_text + ' days').to_numpy(),
+    )
+    
+    notes = np.select(
+        [~found.to_numpy(), meeting_status == 'Past', meeting_status == 'Upcoming'],
+        ['Company not found in database',
+         'Meeting already held - check database for results',
+         'Upcoming meeting - monitor for updates'],
+        'Date validation needed',
+    )
+    
+    analysis_df = pd.DataFrame({
+        'Company': input_column('Company', 'N/A'),
+        'Ticker': input_column('Ticker', 'N/A'),
+        'Clean_Ticker': matched['clean_ticker'].to_numpy(),
+        'Shareholder_Meeting_Date': meeting_dates.to_numpy(),
+        'Last_Shareholder_Meeting_Date': input_column('Last shareholder meeting date'),
+        'Meeting_Status': meeting_status,
+        'Days_Info': days_info,
+        'DB_Found': np.where(found, 'Yes', 'No'),
+        'DB_Company_Name': db_column('company_name'),
+        'DB_Company_ID': db_column('company_id'),
+        'DB_Filing_Date': db_column('filing_date'),
+        'DB_Proposal_Count': matched['proposal_count'].fillna(0).astype(int).to_numpy(),
+        'DB_Category': db_column('category'),
+        'Notes': notes,
+    })
+    
+    # Typed columns (NA for companies not in the database); 'N/A' is only written at export
+    return apply_schema(analysis_df, COMPANY_MEETING_SCHEMA)
+
+def make_synthetic_inputs(n_companies, seed=0):
+    """Random input/DB frames shaped like the Russell3000 file and the sp_def14a fetch"""
+    rng = np.random.default_rng(seed)
+    n_db = max(1, n_companies // 2)
+    tickers = np.array([f"T{i}" for i in range(n_companies * 2)], dtype=object)
+    input_df = pd.DataFrame({
+        'Company': [f"Company {i}" for i in range(n_companies)],
+        'Ticker': tickers[rng.integers(0, len(tickers), n_companies)] + '-US',
+        'Shareholder Meeting Date': pd.Timestamp(date.today()) + pd.to_timedelta(rng.integers(-200, 200, n_companies), unit='D'),
+        'Last shareholder meeting date': pd.Timestamp('2024-06-01'),
+    })
+    company_rows = rng.integers(0, n_db, n_db * 4)
+    db_df = pd.DataFrame({
+        'company_id': company_rows,
+        'company_name': [f"DB Company {i}" for i in company_rows],
+        'company_ticker': tickers[company_rows],
+        'country': 'USA',
+        'filing_date': pd.Timestamp('2025-03-01'),
+        'proposal_name': 'Proposal',
+        'category': 'Governance',
+        'sub_category': 'Board',
+        'vote_outcome': 'Pass',
+        'percentage_support': 55.0,
+    })
+    return input_df, db_df
 
-def categorize_meetings(analysis_df):
+def benchmark(sizes=(3_000, 30_000, 300_000)):
+    """Time analyze_companies on synthetic inputs of growing size"""
+    print("📊 analyze_companies benchmark")
+    for n_companies in sizes:
+        input_df, db_df = make_synthetic_inputs(n_companies)
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            analyze_companies(input_df, db_df)
+        elapsed = time.perf_counter() - start
+        print(f"   {n_companies:>9,} companies / {len(db_df):>9,} DB rows: {elapsed:.2f}s")
+
+def meeting_calendar(analysis_df):
+    """Calendar over the input meeting dates (positions index analysis_df)"""
+    return MeetingCalendar.from_frame(analysis_df, 'Shareholder_Meeting_Date')
+
+def categorize_meetings(analysis_df, calendar=None):
     """Categorize companies by meeting status"""
+    if calendar is None:
+        calendar = meeting_calendar(analysis_df)
+    tomorrow = pd.Timestamp(date.today()) + pd.Timedelta(days=1)
     
-    # Past meetings (Jan 1, 2025 to today)
-    past_meetings = analysis_df[
-        (analysis_df['Meeting_Status'] == 'Past') & 
-        (analysis_df['Shareholder_Meeting_Date'].notna())
-    ].copy()
+    # Past meetings (Jan 1, 2025 to today): 'Past' is any date up to the end of today
+    past_meetings = analysis_df.iloc[calendar.select(end=tomorrow)]
     
     # Upcoming meetings (today to Dec 31, 2025)
-    upcoming_meetings = analysis_df[
-        (analysis_df['Meeting_Status'] == 'Upcoming') & 
-        (analysis_df['Shareholder_Meeting_Date'].notna())
-    ].copy()
+    upcoming_meetings = analysis_df.iloc[calendar.select(start=tomorrow)]
     
     # Companies found in database
-    db_found = analysis_df[analysis_df['DB_Found'] == 'Yes'].copy()
+    db_found = analysis_df[analysis_df['DB_Found'] == 'Yes']
     
     # Companies not found in database
-    db_not_found = analysis_df[analysis_df['DB_Found'] == 'No'].copy()
+    db_not_found = analysis_df[analysis_df['DB_Found'] == 'No']
     
     return past_meetings, upcoming_meetings, db_found, db_not_found
 
-def generate_report(analysis_df, past_meetings, upcoming_meetings, db_found, db_not_found):
+def generate_report(analysis_df, past_meetings, upcoming_meetings, db_found, db_not_found, calendar=None):
     """Generate comprehensive analysis report"""
+    if calendar is None:
+        calendar = meeting_calendar(analysis_df)
+    tomorrow = pd.Timestamp(date.today()) + pd.Timedelta(days=1)
     
     print("\n" + "="*80)
     print("📊 COMPANY MEETING ANALYSIS - 2025")
@@ -204,7 +254,7 @@ def generate_report(analysis_df, past_meetings, upcoming_meetings, db_found, db_
         print(f"   Date Range: {past_meetings['Shareholder_Meeting_Date'].min().strftime('%Y-%m-%d')} to {past_meetings['Shareholder_Meeting_Date'].max().strftime('%Y-%m-%d')}")
         
         # Show recent meetings
-        recent_meetings = past_meetings.nlargest(5, 'Shareholder_Meeting_Date')
+        recent_meetings = analysis_df.iloc[calendar.last(5, end=tomorrow)]
         print(f"\n   Recent Meetings (Last 5):")
         for _, meeting in recent_meetings.iterrows():
             print(f"     - {meeting['Company']} ({meeting['Ticker']}) - {meeting['Shareholder_Meeting_Date'].strftime('%Y-%m-%d')}")
@@ -216,7 +266,7 @@ def generate_report(analysis_df, past_meetings, upcoming_meetings, db_found, db_
         print(f"   Date Range: {upcoming_meetings['Shareholder_Meeting_Date'].min().strftime('%Y-%m-%d')} to {upcoming_meetings['Shareholder_Meeting_Date'].max().strftime('%Y-%m-%d')}")
         
         # Show next meetings
-        next_meetings = upcoming_meetings.nsmallest(5, 'Shareholder_Meeting_Date')
+        next_meetings = analysis_df.iloc[calendar.first(5, start=tomorrow)]
         print(f"\n   Next Meetings (Next 5):")
         for _, meeting in next_meetings.iterrows():
             print(f"     - {meeting['Company']} ({meeting['Ticker']}) - {meeting['Shareholder_Meeting_Date'].strftime('%Y-%m-%d')}")
@@ -226,7 +276,7 @@ def export_results(analysis_df, past_meetings, upcoming_meetings, db_found, db_n
     
     print(f"\n💾 Exporting results to {output_file}...")
     
-    with pd.ExcelWriter(output_file, engine='openpyxl') as writer:
+    with StreamingReportWriter(output_file, missing=COMPANY_MEETING_MISSING) as writer:
         
         # 1. Summary sheet
         summary_data = {
@@ -241,7 +291,7 @@ def export_results(analysis_df, past_meetings, upcoming_meetings, db_found, db_n
             ],
             'Value': [
                 len(analysis_df),
-                len(analysis_df[analysis_df['Shareholder_Meeting_Date'].notna()]),
+                int(analysis_df['Shareholder_Meeting_Date'].notna().sum()),
                 len(db_found),
                 len(db_not_found),
                 len(past_meetings),
@@ -249,41 +299,51 @@ def export_results(analysis_df, past_meetings, upcoming_meetings, db_found, db_n
                 datetime.now().strftime('%Y-%m-%d %H:%M:%S')
             ]
         }
-        pd.DataFrame(summary_data).to_excel(writer, sheet_name='Summary', index=False)
+        writer.write_sheet('Summary', pd.DataFrame(summary_data))
         
         # 2. All companies analysis
         export_columns = [
             'Company', 'Ticker', 'Shareholder_Meeting_Date', 'Last_Shareholder_Meeting_Date',
             'Meeting_Status', 'Days_Info', 'DB_Found', 'DB_Company_Name', 'DB_Filing_Date', 'Notes'
         ]
-        analysis_df[export_columns].to_excel(writer, sheet_name='All_Companies_Analysis', index=False)
+        writer.write_sheet('All_Companies_Analysis', analysis_df, columns=export_columns)
         
         # 3. Past meetings
         if len(past_meetings) > 0:
-            past_export = past_meetings[export_columns].copy()
-            past_export.to_excel(writer, sheet_name='Past_Meetings_2025', index=False)
+            writer.write_sheet('Past_Meetings_2025', past_meetings, columns=export_columns)
         
         # 4. Upcoming meetings
         if len(upcoming_meetings) > 0:
-            upcoming_export = upcoming_meetings[export_columns].copy()
-            upcoming_export.to_excel(writer, sheet_name='Upcoming_Meetings_2025', index=False)
+            writer.write_sheet('Upcoming_Meetings_2025', upcoming_meetings, columns=export_columns)
         
         # 5. Companies found in database
         if len(db_found) > 0:
-            db_found_export = db_found[export_columns].copy()
-            db_found_export.to_excel(writer, sheet_name='Companies_In_Database', index=False)
+            writer.write_sheet('Companies_In_Database', db_found, columns=export_columns)
         
         # 6. Companies not found in database
         if len(db_not_found) > 0:
-            db_not_found_export = db_not_found[export_columns].copy()
-            db_not_found_export.to_excel(writer, sheet_name='Companies_Not_In_Database', index=False)
+            writer.write_sheet('Companies_Not_In_Database', db_not_found, columns=export_columns)
         
         # 7. Company ticker list (for easy reference)
-        ticker_list = analysis_df[['Company', 'Ticker', 'Shareholder_Meeting_Date', 'Meeting_Status', 'DB_Found']].copy()
-        ticker_list.to_excel(writer, sheet_name='Company_Ticker_List', index=False)
+        writer.write_sheet('Company_Ticker_List', analysis_df,
+                           columns=['Company', 'Ticker', 'Shareholder_Meeting_Date', 'Meeting_Status', 'DB_Found'])
     
     print(f"✅ Data exported successfully to {output_file}")
 
+def run_report(input_df, db_df):
+    """Analyze, categorize, report and export (everything after the input and database reads)"""
+    if PARALLEL_VALIDATION:
+        analysis_df = run_sharded(analyze_companies,
+                                  input_df, normalize_tickers(input_df['Ticker']),
+                                  db_df, normalize_tickers(db_df['company_ticker']))
+    else:
+        analysis_df = analyze_companies(input_df, db_df)
+    calendar = meeting_calendar(analysis_df)
+    past_meetings, upcoming_meetings, db_found, db_not_found = categorize_meetings(analysis_df, calendar)
+    generate_report(analysis_df, past_meetings, upcoming_meetings, db_found, db_not_found, calendar)
+    export_results(analysis_df, past_meetings, upcoming_meetings, db_found, db_not_found)
+    return analysis_df
+
 def main():
     """Main execution function"""
     print("🚀 Starting Company Meeting Analysis for 2025...")
@@ -308,26 +368,17 @@ def main():
         db_df = fetch_db_companies(conn)
         if db_df is None:
             print("❌ Cannot proceed without database data")
-            conn.close()
+            release_connection(conn)
             return
         
         print(f"✅ Fetched {len(db_df)} records from database")
         
-        # ===== 4. Analyze Companies =====
-        analysis_df = analyze_companies(input_df, db_df)
-        
-        # ===== 5. Categorize Results =====
-        past_meetings, upcoming_meetings, db_found, db_not_found = categorize_meetings(analysis_df)
-        
-        # ===== 6. Generate Report =====
-        generate_report(analysis_df, past_meetings, upcoming_meetings, db_found, db_not_found)
-        
-        # ===== 7. Export Results =====
-        export_results(analysis_df, past_meetings, upcoming_meetings, db_found, db_not_found)
+        # ===== 4. Analyze, Report and Export =====
+        run_report(input_df, db_df)
         
-        # ===== 8. Cleanup =====
-        conn.close()
-        print("✅ Database connection closed")
+        # ===== 5. Cleanup =====
+        release_connection(conn)
+        print("✅ Database connection released")
         
         print("\n🎉 Company meeting analysis completed successfully!")
         
@@ -337,4 +388,7 @@ def main():
         traceback.print_exc()
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    if '--benchmark' in sys.argv:
+        benchmark()
+    else:
+        main() 
\ No newline at end of file
@@ -0,0 +1,106 @@
+import threading
+import time
+from contextlib import contextmanager
+
+import psycopg2
+from psycopg2 import pool
+
+# ===== CONFIGURATION =====
+MIN_CONNECTIONS = 1
+MAX_CONNECTIONS = 8
+STATEMENT_TIMEOUT_MS = 10 * 60 * 1000   # abort queries running longer than 10 minutes
+HEALTH_CHECK_INTERVAL = 30              # seconds a connection may sit idle before it is pinged
+
+_pool = None
+_pool_lock = threading.Lock()
+_last_used = {}
+
+
+def load_db_config():
+    """Load DB_CONFIG from db_config.py (copy db_config_template.py to create it)"""
+    try:
+        from db_config import DB_CONFIG
+    except ImportError:
+        print("❌ db_config.py not found - copy db_config_template.py to db_config.py and add your credentials")
+        raise
+    return dict(DB_CONFIG)
+
+
+def get_pool():
+    """Create the process-wide connection pool on first use"""
+    global _pool
+    with _pool_lock:
+        if _pool is None or _pool.closed:
+            config = load_db_config()
+            timeout_option = f"-c statement_timeout={STATEMENT_TIMEOUT_MS}"
+            config['options'] = f"{config['options']} {timeout_option}" if config.get('options') else timeout_option
+            _pool = pool.ThreadedConnectionPool(MIN_CONNECTIONS, MAX_CONNECTIONS, **config)
+        return _pool
+
+
+def _is_healthy(conn):
+    """Ping connections that have been idle a while; fresh ones are trusted"""
+    if conn.closed:
+        return False
+    if time.monotonic() - _last_used.get(id(conn), 0) < HEALTH_CHECK_INTERVAL:
+        return True
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT 1")
+        if not conn.autocommit:
+            conn.rollback()
+        return True
+    except psycopg2.Error:
+        return False
+
+
+def get_connection(autocommit=True):
+    """Check a healthy connection out of the pool"""
+    connection_pool = get_pool()
+    for _ in range(MAX_CONNECTIONS + 1):
+        conn = connection_pool.getconn()
+        if _is_healthy(conn):
+            # Pooled connections are always idle (release rolls back), so this is safe
+            conn.autocommit = autocommit
+            return conn
+        print("⚠️ Discarding broken database connection")
+        _last_used.pop(id(conn), None)
+        connection_pool.putconn(conn, close=True)
+    raise psycopg2.OperationalError("Could not obtain a healthy database connection")
+
+
+def release_connection(conn):
+    """Return a connection to the pool (closing it if it is broken)"""
+    if conn is None or _pool is None:
+        return
+    broken = bool(conn.closed)
+    if not broken and not conn.autocommit:
+        try:
+            conn.rollback()
+        except psycopg2.Error:
+            broken = True
+    if broken:
+        _last_used.pop(id(conn), None)
+    else:
+        _last_used[id(conn)] = time.monotonic()
+    _pool.putconn(conn, close=broken)
+
+
+@contextmanager
+def connection(autocommit=True):
+    """Borrow a pooled connection for the duration of a with-block"""
+    conn = get_connection(autocommit=autocommit)
+    try:
+        yield conn
+    finally:
+        release_connection(conn)
+
+
+def close_pool():
+    """Close every pooled connection (call once at the end of a batch)"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None and not _pool.closed:
+            _pool.closeall()
+        _pool = None
+        _last_used.clear()
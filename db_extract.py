@@ -0,0 +1,359 @@
+import csv
+import sys
+import tempfile
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+import xlsxwriter
+
+from db import MAX_CONNECTIONS, connection
+
+# ===== CONFIGURATION =====
+DEFAULT_ITERSIZE = 20000         # rows fetched from the server per round-trip
+EXCEL_MAX_ROWS = 1_048_576       # including the header row
+COPY_SPOOL_BYTES = 64 * 1024 * 1024  # COPY output kept in memory up to this size, then spilled to disk
+SHARD_WORKERS = 4                # shards extracted at once, each on its own pooled connection
+SHARD_ID_RANGES = 4              # company id ranges per (year, country group)
+
+# Country spellings extracted together as one shard group; every other value
+# (and NULL) goes to a final 'other' group, so the shards always cover every row
+COUNTRY_GROUPS = {
+    'US': ('USA', 'US', 'United States'),
+}
+
+# PostgreSQL type OIDs -> Arrow types used when parsing COPY output (anything else stays text)
+PG_TYPE_TO_ARROW = {
+    16: pa.bool_(),
+    20: pa.int64(), 21: pa.int16(), 23: pa.int32(),
+    700: pa.float32(), 701: pa.float64(), 1700: pa.float64(),
+    1082: pa.date32(),
+    1114: pa.timestamp('us'), 1184: pa.timestamp('us', tz='UTC'),
+}
+
+
+def stream_query(query, params=None, itersize=DEFAULT_ITERSIZE):
+    """Run query on a named (server-side) cursor and yield (columns, rows) chunks.
+
+    Only one chunk of at most itersize rows is held in client memory at a time.
+    """
+    with connection(autocommit=False) as conn:
+        with conn.cursor(name=f"extract_{uuid.uuid4().hex}") as cur:
+            cur.itersize = itersize
+            cur.execute(query, params)
+            columns = None
+            while True:
+                rows = cur.fetchmany(itersize)
+                if columns is None:
+                    columns = [desc[0] for desc in cur.description]
+                    if not rows:
+                        yield columns, rows  # empty result: still report the columns
+                if not rows:
+                    break
+                yield columns, rows
+
+
+class _ExcelSink:
+    """Row-at-a-time .xlsx writer (xlsxwriter constant_memory mode).
+
+    Starts a new sheet whenever Excel's row limit is reached.
+    """
+
+    def __init__(self, path):
+        self.workbook = xlsxwriter.Workbook(path, {
+            'constant_memory': True,
+            'default_date_format': 'yyyy-mm-dd',
+            'remove_timezone': True,
+        })
+        self.sheet = None
+        self.sheet_count = 0
+        self.row = 0
+
+    def _new_sheet(self, columns):
+        self.sheet_count += 1
+        self.sheet = self.workbook.add_worksheet(f"Sheet{self.sheet_count}")
+        self.sheet.write_row(0, 0, columns)
+        self.row = 1
+
+    def write(self, columns, rows):
+        for values in rows:
+            if self.sheet is None or self.row >= EXCEL_MAX_ROWS:
+                self._new_sheet(columns)
+            self.sheet.write_row(self.row, 0, values)
+            self.row += 1
+
+    def close(self, columns):
+        if self.sheet is None and columns:
+            self._new_sheet(columns)
+        self.workbook.close()
+
+
+class _CsvSink:
+    def __init__(self, path):
+        self.file = open(path, 'w', newline='', encoding='utf-8')
+        self.writer = csv.writer(self.file)
+        self.header_written = False
+
+    def write(self, columns, rows):
+        if not self.header_written:
+            self.writer.writerow(columns)
+            self.header_written = True
+        self.writer.writerows(rows)
+
+    def close(self, columns):
+        if not self.header_written and columns:
+            self.writer.writerow(columns)
+        self.file.close()
+
+
+def export_query(query, output_file, params=None, itersize=DEFAULT_ITERSIZE, preview_rows=20):
+    """Stream a query's result straight into an .xlsx or .csv file.
+
+    Memory stays flat regardless of result size; the first preview_rows rows
+    are printed as a sample. Returns the number of rows written.
+    """
+    sink = _CsvSink(output_file) if output_file.lower().endswith('.csv') else _ExcelSink(output_file)
+    total = 0
+    columns = None
+    try:
+        for columns, rows in stream_query(query, params, itersize):
+            if total < preview_rows:
+                for values in rows[:preview_rows - total]:
+                    print(dict(zip(columns, values)))
+            sink.write(columns, rows)
+            total += len(rows)
+            print(f"   ... {total} rows written")
+    finally:
+        sink.close(columns)
+    return total
+
+
+def _copy_statement(cur, query, params):
+    """Inline the parameters (COPY takes none) and wrap the query in COPY ... TO STDOUT"""
+    sql = cur.mogrify(query, params).decode() if params else query
+    sql = sql.strip().rstrip(';')
+    return f"COPY ({sql}) TO STDOUT WITH (FORMAT csv, HEADER true)", sql
+
+
+def copy_query_to_table(query, params=None, conn=None):
+    """Fetch a query with COPY ... TO STDOUT and parse it into a typed Arrow table.
+
+    Rows never become Python tuples: PostgreSQL streams CSV, which Arrow's
+    C++ reader turns straight into typed columns (types come from the
+    query's result description).
+    """
+    if conn is None:
+        with connection() as pooled:
+            return copy_query_to_table(query, params, pooled)
+
+    with conn.cursor() as cur:
+        copy_sql, select_sql = _copy_statement(cur, query, params)
+        cur.execute(f"SELECT * FROM ({select_sql}) AS q LIMIT 0")
+        column_types = {
+            desc.name: PG_TYPE_TO_ARROW.get(desc.type_code, pa.string()) for desc in cur.description
+        }
+        with tempfile.SpooledTemporaryFile(max_size=COPY_SPOOL_BYTES) as buffer:
+            cur.copy_expert(copy_sql, buffer)
+            buffer.seek(0)
+            return pa_csv.read_csv(buffer, convert_options=pa_csv.ConvertOptions(
+                column_types=column_types,
+                true_values=['t'], false_values=['f'],
+                strings_can_be_null=True, quoted_strings_can_be_null=False,
+            ))
+
+
+def _write_xlsx(table, output_file, batch_rows=DEFAULT_ITERSIZE):
+    """Stream an Arrow table into an .xlsx through _ExcelSink, batch_rows rows at a time.
+
+    Tables past Excel's row limit continue on further sheets, and only one
+    batch is ever turned into Python values.
+    """
+    sink = _ExcelSink(output_file)
+    try:
+        for batch in table.to_batches(max_chunksize=batch_rows):
+            sink.write(table.column_names, zip(*(column.to_pylist() for column in batch.columns)))
+    finally:
+        sink.close(table.column_names)
+    if sink.sheet_count > 1:
+        print(f"⚠️ {table.num_rows:,} rows exceed Excel's row limit - split over {sink.sheet_count} sheets")
+
+
+def _write_table(table, output_file):
+    if output_file.lower().endswith('.csv'):
+        pa_csv.write_csv(table, output_file)
+    elif output_file.lower().endswith('.parquet'):
+        pq.write_table(table, output_file)
+    else:
+        _write_xlsx(table, output_file)
+    return table.num_rows
+
+
+def copy_export(query, output_file, params=None, conn=None):
+    """Export a query with COPY to .csv (streamed as-is), .parquet or .xlsx; returns rows written"""
+    if output_file.lower().endswith('.csv'):
+        if conn is None:
+            with connection() as pooled:
+                return copy_export(query, output_file, params, pooled)
+        with conn.cursor() as cur, open(output_file, 'wb') as out:
+            copy_sql, _ = _copy_statement(cur, query, params)
+            cur.copy_expert(copy_sql, out)
+            return cur.rowcount
+
+    return _write_table(copy_query_to_table(query, params, conn), output_file)
+
+
+def plan_shards(years, country_groups=COUNTRY_GROUPS, id_ranges=SHARD_ID_RANGES, id_table='public.company'):
+    """Split an extract into (label, condition, params) shards by year, country group and id range.
+
+    Conditions apply to the extract query's output, which must have `year`,
+    `country` and `id` columns. Id ranges split [min(id), max(id)] of
+    id_table evenly.
+    """
+    with connection() as conn, conn.cursor() as cur:
+        cur.execute(f"SELECT min(id), max(id) FROM {id_table}")
+        low, high = cur.fetchone()
+    if low is None:
+        return []
+    step = -(-(high - low + 1) // id_ranges)
+    id_bounds = [(start, min(start + step - 1, high)) for start in range(low, high + 1, step)]
+
+    listed = [country for spellings in country_groups.values() for country in spellings]
+    groups = [(name, "q.country = ANY(%s)", [list(spellings)]) for name, spellings in country_groups.items()]
+    groups.append(('other', "(q.country IS NULL OR NOT q.country = ANY(%s))", [listed]))
+
+    return [
+        (f"{year}/{name}/{first}-{last}",
+         f"q.year = %s AND {country_condition} AND q.id BETWEEN %s AND %s",
+         [year, *country_params, first, last])
+        for year in years
+        for name, country_condition, country_params in groups
+        for first, last in id_bounds
+    ]
+
+
+def _extract_shard(query, shard):
+    label, condition, params = shard
+    # The extract query runs unparameterized, so its own % signs are literal
+    shard_sql = f"SELECT * FROM ({query.strip().rstrip(';').replace('%', '%%')}) AS q WHERE {condition}"
+    start = time.perf_counter()
+    table = copy_query_to_table(shard_sql, params)
+    # Sorted on every column client-side: Arrow's sort is far cheaper than a server ORDER BY on a row
+    table = table.sort_by([(name, 'ascending') for name in table.column_names])
+    return table, time.perf_counter() - start
+
+
+def sharded_query_to_table(query, shards, workers=SHARD_WORKERS):
+    """Run every shard of query concurrently (COPY on pooled connections) and concatenate them.
+
+    Shards are merged in plan order and each is sorted on all its columns,
+    so the result is the same from run to run whatever order shards finish
+    in. Per-shard row counts and timings are printed.
+    """
+    workers = max(1, min(workers, MAX_CONNECTIONS, len(shards)))
+    print(f"🧩 Extracting {len(shards)} shards with {workers} workers")
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(lambda shard: _extract_shard(query, shard), shards))
+
+    for (label, _, _), (table, elapsed) in zip(shards, results):
+        print(f"   {label:<32} {table.num_rows:>9,} rows  {elapsed:6.2f}s")
+    if results:
+        combined = pa.concat_tables([table for table, _ in results])
+    else:
+        combined = copy_query_to_table(f"SELECT * FROM ({query.strip().rstrip(';')}) AS q LIMIT 0")
+    print(f"   {'total':<32} {combined.num_rows:>9,} rows  {time.perf_counter() - start:6.2f}s")
+    return combined
+
+
+def sharded_export(query, output_file, years, workers=SHARD_WORKERS, **plan_options):
+    """Sharded extract of query to .csv, .parquet or .xlsx; returns rows written.
+
+    .xlsx output continues on new sheets past Excel's row limit.
+    """
+    shards = plan_shards(years, **plan_options)
+    return _write_table(sharded_query_to_table(query, shards, workers), output_file)
+
+
+def _fetchall_frame(query, params, conn):
+    """The classic path: cursor.fetchall() into a DataFrame"""
+    with conn.cursor() as cur:
+        cur.execute(query, params)
+        rows = cur.fetchall()
+        columns = [desc[0] for desc in cur.description]
+    return pd.DataFrame(rows, columns=columns)
+
+
+def benchmark_copy(rows=1_000_000, repeats=3):
+    """Compare fetchall vs COPY on a generated table (run against a local PostgreSQL fixture).
+
+    The fixture is a TEMP table shaped like the company x home_meeting_details
+    extracts, so nothing is left behind in the database.
+    """
+    with connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute("DROP TABLE IF EXISTS bench_extract")
+            cur.execute("""
+                CREATE TEMP TABLE bench_extract AS
+                SELECT g AS id,
+                       'Company ' || g AS name,
+                       'TK' || g AS symbol,
+                       'TK' || g || '-US' AS exchng_ticker,
+                       g %% 3 <> 0 AS russel_3000,
+                       (ARRAY['USA', 'US', 'United States'])[1 + g %% 3] AS country,
+                       2024 + g %% 2 AS year,
+                       DATE '2024-01-01' + (g %% 700) AS meeting_date,
+                       (g %% 10000) / 100.0 AS percentage_support
+                FROM generate_series(1, %s) AS g
+            """, (rows,))
+        query = "SELECT * FROM bench_extract"
+        print(f"📊 Benchmark: {rows:,} rows, best of {repeats}")
+
+        def best(fn):
+            timings = []
+            for _ in range(repeats):
+                start = time.perf_counter()
+                fn()
+                timings.append(time.perf_counter() - start)
+            return min(timings)
+
+        fetchall_time = best(lambda: _fetchall_frame(query, None, conn))
+        copy_time = best(lambda: copy_query_to_table(query, None, conn).to_pandas())
+        print(f"   fetchall -> DataFrame : {fetchall_time:.2f}s")
+        print(f"   COPY -> Arrow -> pandas: {copy_time:.2f}s ({fetchall_time / copy_time:.1f}x faster)")
+
+        with conn.cursor() as cur:
+            cur.execute("DROP TABLE IF EXISTS bench_extract")
+
+
+# company x home_meeting_details, the shape of the Just_Fetch extracts
+SHARD_BENCHMARK_QUERY = """
+    SELECT c.id, c."name", c.symbol, c.exchng_ticker, c.russel_3000, c.country,
+           hmd.year, hmd.meeting_date::date AS meeting_date
+    FROM public.company c
+    JOIN public.home_meeting_details hmd ON c.id = hmd.company_id
+    WHERE hmd.year IN (2024, 2025)
+"""
+
+
+def benchmark_sharded(query=SHARD_BENCHMARK_QUERY, years=(2024, 2025), worker_counts=(1, 2, 4, 8)):
+    """Compare one COPY of the whole extract against sharded extraction at several worker counts"""
+    start = time.perf_counter()
+    rows = copy_query_to_table(query).num_rows
+    print(f"📊 Monolithic COPY: {rows:,} rows in {time.perf_counter() - start:.2f}s")
+
+    shards = plan_shards(years)
+    for workers in worker_counts:
+        start = time.perf_counter()
+        sharded_query_to_table(query, shards, workers)
+        print(f"📊 {len(shards)} shards x {workers} workers: {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    if '--benchmark' in sys.argv:
+        benchmark_copy()
+    if '--benchmark-shards' in sys.argv:
+        benchmark_sharded()
@@ -1,18 +1,13 @@
 import pandas as pd
-import psycopg2
 from datetime import datetime, date
 
-# Database credentials
-DB_CONFIG = {
-    #    // Please Add DB Creds
-}
+from db import get_connection, release_connection
 
 def debug_dates():
     """Debug the date handling issue"""
     
     try:
-        conn = psycopg2.connect(**DB_CONFIG)
-        conn.autocommit = True
+        conn = get_connection()
         cursor = conn.cursor()
         
         # Fetch sample data
@@ -41,7 +36,7 @@ def debug_dates():
         db_df = pd.DataFrame(results, columns=columns)
         
         cursor.close()
-        conn.close()
+        release_connection(conn)
         
         print("🔍 DEBUGGING DATE HANDLING")
         print("="*50)
@@ -1,34 +1,48 @@
+import sys
+
 import pandas as pd
-import psycopg2
 from datetime import datetime, date
 import warnings
 warnings.filterwarnings('ignore')
 
-# ===== CONFIGURATION =====
-# Database credentials
-DB_CONFIG = {
-    #    // Please Add DB Creds
-}
+from db import get_connection, release_connection
+from input_workbook import read_input_workbook
+from parallel_validation import run_sharded
+from query_cache import QueryCache, cached_query
+from report_writer import StreamingReportWriter
+from ticker_normalize import normalize_tickers
+from validation_schema import FOCUSED_MISSING, FOCUSED_SCHEMA, apply_schema
 
+# ===== CONFIGURATION =====
 # Input and output files
 input_file = "Russell3000 Feb 2025(Upcoming shareholder meeting).xlsx"
 output_file = "Focused_Validation_2025.xlsx"
 
+# Serve unchanged query results from the local result cache (run with --refresh to re-query)
+USE_QUERY_CACHE = True
+FORCE_REFRESH = '--refresh' in sys.argv
+
+# Validate large inputs in ticker-hash shards across worker processes (run with --parallel)
+PARALLEL_VALIDATION = '--parallel' in sys.argv
+
 def connect_to_db():
-    """Establish database connection"""
+    """Check out a pooled database connection"""
     try:
-        conn = psycopg2.connect(**DB_CONFIG)
-        conn.autocommit = True
-        return conn
+        return get_connection()
     except Exception as e:
         print(f"❌ Database connection failed: {e}")
         return None
 
+# Columns this report reads from the sp_def14a fetch (report_pipeline fetches their union once)
+DB_COLUMNS = [
+    'company_id', 'company_name', 'company_ticker', 'country', 'filing_date', 'proposal_name',
+    'category', 'sub_category', 'vote_outcome', 'percentage_support', 'outcome_percentage',
+    'proponent', 'proposal_num', 'link_to_filing',
+]
+
 def fetch_db_companies_with_details(conn):
     """Fetch companies from database with detailed 2025 data"""
     try:
-        cursor = conn.cursor()
-        
         # Query to get companies with 2025 data and filing details
         query = """
             SELECT DISTINCT
@@ -52,14 +66,8 @@ def fetch_db_companies_with_details(conn):
             ORDER BY c.symbol;
         """
         
-        cursor.execute(query)
-        results = cursor.fetchall()
-        
-        # Convert to DataFrame
-        columns = [desc[0] for desc in cursor.description]
-        db_df = pd.DataFrame(results, columns=columns)
-        
-        cursor.close()
+        cache = QueryCache(refresh=FORCE_REFRESH) if USE_QUERY_CACHE else None
+        db_df = cached_query(conn, query, cache=cache)
         return db_df
         
     except Exception as e:
@@ -70,7 +78,7 @@ def read_russell3000_file():
     """Read the Russell3000 input file"""
     try:
         print(f"📖 Reading Russell3000 file: {input_file}")
-        input_df = pd.read_excel(input_file)
+        input_df = read_input_workbook(input_file)
         print(f"✅ Loaded {len(input_df)} records from Russell3000 file")
         
         # Show column names
@@ -81,11 +89,32 @@ def read_russell3000_file():
         print(f"❌ Error reading Russell3000 file: {e}")
         return None
 
-def clean_ticker(ticker):
-    """Clean ticker symbol (remove -US suffix and convert to uppercase)"""
-    if pd.isna(ticker):
-        return None
-    return str(ticker).replace('-US', '').replace('-CA', '').strip().upper()
+# sp_def14a columns reported for each company's first proposal
+PROPOSAL_COLUMNS = {
+    'filing_date': 'DB_Filing_Date',
+    'category': 'DB_Category',
+    'sub_category': 'DB_Sub_Category',
+    'vote_outcome': 'DB_Vote_Outcome',
+    'percentage_support': 'DB_Support_Percentage',
+    'outcome_percentage': 'DB_Outcome_Percentage',
+    'proponent': 'DB_Proponent',
+    'proposal_num': 'DB_Proposal_Num',
+    'link_to_filing': 'DB_Link_To_Filing',
+}
+
+def build_company_index(db_df):
+    """One row per clean ticker: the first matching company, its proposal count and first proposal.
+
+    The first DB row carrying a clean ticker is also the first proposal of
+    that company, so a single drop_duplicates gives both.
+    """
+    proposal_counts = db_df.groupby('company_id').size()
+    company_index = (db_df[db_df['clean_ticker'].notna()]
+                     .drop_duplicates('clean_ticker')
+                     [['clean_ticker', 'company_id', 'company_name', 'country', *PROPOSAL_COLUMNS]]
+                     .astype(object))
+    company_index['proposal_count'] = company_index['company_id'].map(proposal_counts)
+    return company_index
 
 def validate_russell3000_against_db(russell_df, db_df):
     """Validate Russell3000 companies against database companies"""
@@ -93,92 +122,48 @@ def validate_russell3000_against_db(russell_df, db_df):
     print("\n🔍 Validating Russell3000 companies against database...")
     
     # Clean tickers in both datasets
-    russell_df['clean_ticker'] = russell_df['Ticker'].apply(clean_ticker)
-    db_df['clean_ticker'] = db_df['company_ticker'].apply(clean_ticker)
+    russell_df['clean_ticker'] = normalize_tickers(russell_df['Ticker'])
+    db_df['clean_ticker'] = normalize_tickers(db_df['company_ticker'])
     
-    # Get unique companies from database
-    db_companies = db_df[['company_id', 'company_name', 'company_ticker', 'clean_ticker', 'country']].drop_duplicates()
+    company_index = build_company_index(db_df)
     
+    db_companies = db_df[['company_id', 'company_name', 'company_ticker', 'clean_ticker', 'country']].drop_duplicates()
     print(f"📊 Database has {len(db_companies)} unique companies")
     print(f"📊 Russell3000 has {len(russell_df)} companies")
     
-    # Find matches between Russell3000 and database
-    validation_results = []
+    # Join every Russell3000 row to its company in one merge
+    matched = pd.DataFrame({'clean_ticker': russell_df['clean_ticker'].astype(object).to_numpy()}).merge(
+        company_index, on='clean_ticker', how='left')
+    found = matched['company_id'].notna()
     
-    for idx, russell_row in russell_df.iterrows():
-        company_name = russell_row.get('Company', 'N/A')
-        ticker = russell_row.get('Ticker', 'N/A')
-        ticker_clean = russell_row.get('clean_ticker', 'N/A')
-        meeting_date = russell_row.get('Shareholder Meeting Date')
-        last_meeting_date = russell_row.get('Last shareholder meeting date')
-        
-        # Find matching company in database
-        db_match = db_companies[db_companies['clean_ticker'] == ticker_clean]
-        
-        if len(db_match) > 0:
-            # Company found in database - get detailed data
-            db_company_id = db_match['company_id'].iloc[0]
-            db_company_name = db_match['company_name'].iloc[0]
-            db_country = db_match['country'].iloc[0]
-            
-            # Get all proposals for this company
-            company_proposals = db_df[db_df['company_id'] == db_company_id]
-            
-            # Create validation result
-            validation_result = {
-                'Russell3000_Company': company_name,
-                'Russell3000_Ticker': ticker,
-                'Clean_Ticker': clean_ticker,
-                'Russell3000_Meeting_Date': meeting_date,
-                'Russell3000_Last_Meeting_Date': last_meeting_date,
-                'DB_Found': 'Yes',
-                'DB_Company_ID': db_company_id,
-                'DB_Company_Name': db_company_name,
-                'DB_Country': db_country,
-                'DB_Proposal_Count': len(company_proposals),
-                'DB_Filing_Date': company_proposals['filing_date'].iloc[0] if len(company_proposals) > 0 else 'N/A',
-                'DB_Category': company_proposals['category'].iloc[0] if len(company_proposals) > 0 else 'N/A',
-                'DB_Sub_Category': company_proposals['sub_category'].iloc[0] if len(company_proposals) > 0 else 'N/A',
-                'DB_Vote_Outcome': company_proposals['vote_outcome'].iloc[0] if len(company_proposals) > 0 else 'N/A',
-                'DB_Support_Percentage': company_proposals['percentage_support'].iloc[0] if len(company_proposals) > 0 else 'N/A',
-                'DB_Outcome_Percentage': company_proposals['outcome_percentage'].iloc[0] if len(company_proposals) > 0 else 'N/A',
-                'DB_Proponent': company_proposals['proponent'].iloc[0] if len(company_proposals) > 0 else 'N/A',
-                'DB_Proposal_Num': company_proposals['proposal_num'].iloc[0] if len(company_proposals) > 0 else 'N/A',
-                'DB_Link_To_Filing': company_proposals['link_to_filing'].iloc[0] if len(company_proposals) > 0 else 'N/A',
-                'Validation_Status': 'Validated - Found in Database',
-                'Notes': f'Company has {len(company_proposals)} proposals in database'
-            }
-            
-            validation_results.append(validation_result)
-        else:
-            # Company NOT found in database
-            validation_result = {
-                'Russell3000_Company': company_name,
-                'Russell3000_Ticker': ticker,
-                'Clean_Ticker': clean_ticker,
-                'Russell3000_Meeting_Date': meeting_date,
-                'Russell3000_Last_Meeting_Date': last_meeting_date,
-                'DB_Found': 'No',
-                'DB_Company_ID': 'N/A',
-                'DB_Company_Name': 'N/A',
-                'DB_Country': 'N/A',
-                'DB_Proposal_Count': 0,
-                'DB_Filing_Date': 'N/A',
-                'DB_Category': 'N/A',
-                'DB_Sub_Category': 'N/A',
-                'DB_Vote_Outcome': 'N/A',
-                'DB_Support_Percentage': 'N/A',
-                'DB_Outcome_Percentage': 'N/A',
-                'DB_Proponent': 'N/A',
-                'DB_Proposal_Num': 'N/A',
-                'DB_Link_To_Filing': 'N/A',
-                'Validation_Status': 'Not Found in Database',
-                'Notes': 'Company not found in database - needs to be added'
-            }
-            
-            validation_results.append(validation_result)
+    def russell_column(name, default=None):
+        return russell_df[name].to_numpy() if name in russell_df.columns else default
+    
+    def db_column(name):
+        return matched[name].where(found).to_numpy()
+    
+    proposal_counts = matched['proposal_count'].fillna(0).astype(int)
+    
+    validation_df = pd.DataFrame({
+        'Russell3000_Company': russell_column('Company', 'N/A'),
+        'Russell3000_Ticker': russell_column('Ticker', 'N/A'),
+        'Clean_Ticker': matched['clean_ticker'].to_numpy(),
+        'Russell3000_Meeting_Date': russell_column('Shareholder Meeting Date'),
+        'Russell3000_Last_Meeting_Date': russell_column('Last shareholder meeting date'),
+        'DB_Found': found.map({True: 'Yes', False: 'No'}).to_numpy(),
+        'DB_Company_ID': db_column('company_id'),
+        'DB_Company_Name': db_column('company_name'),
+        'DB_Country': db_column('country'),
+        'DB_Proposal_Count': proposal_counts.to_numpy(),
+        **{output: db_column(column) for column, output in PROPOSAL_COLUMNS.items()},
+        'Validation_Status': found.map({True: 'Validated - Found in Database',
+                                        False: 'Not Found in Database'}).to_numpy(),
+        'Notes': ('Company has ' + proposal_counts.astype(str) + ' proposals in database')
+                 .where(found, 'Company not found in database - needs to be added').to_numpy(),
+    })
     
-    return pd.DataFrame(validation_results)
+    # Typed columns (NA for unmatched companies); 'N/A' is only written at export
+    return apply_schema(validation_df, FOCUSED_SCHEMA)
 
 def generate_focused_report(validation_df):
     """Generate focused validation report"""
@@ -223,7 +208,10 @@ def export_focused_results(validation_df):
     
     print(f"\n💾 Exporting focused validation results to {output_file}...")
     
-    with pd.ExcelWriter(output_file, engine='openpyxl') as writer:
+    found = (validation_df['DB_Found'] == 'Yes').to_numpy()
+    not_found = (validation_df['DB_Found'] == 'No').to_numpy()
+    
+    with StreamingReportWriter(output_file, missing=FOCUSED_MISSING) as writer:
         
         # 1. Summary sheet
         summary_data = {
@@ -236,38 +224,48 @@ def export_focused_results(validation_df):
             ],
             'Value': [
                 len(validation_df),
-                len(validation_df[validation_df['DB_Found'] == 'Yes']),
-                len(validation_df[validation_df['DB_Found'] == 'No']),
-                f"{(len(validation_df[validation_df['DB_Found'] == 'Yes'])/len(validation_df))*100:.1f}%",
+                int(found.sum()),
+                int(not_found.sum()),
+                f"{(found.sum()/len(validation_df))*100:.1f}%",
                 datetime.now().strftime('%Y-%m-%d %H:%M:%S')
             ]
         }
-        pd.DataFrame(summary_data).to_excel(writer, sheet_name='Summary', index=False)
+        writer.write_sheet('Summary', pd.DataFrame(summary_data))
         
         # 2. All companies validation
-        validation_df.to_excel(writer, sheet_name='All_Companies_Validation', index=False)
+        writer.write_sheet('All_Companies_Validation', validation_df)
         
         # 3. Companies found in database (focus on these)
-        found_companies = validation_df[validation_df['DB_Found'] == 'Yes'].copy()
-        if len(found_companies) > 0:
-            found_companies.to_excel(writer, sheet_name='Companies_Found_In_DB', index=False)
+        if found.any():
+            writer.write_sheet('Companies_Found_In_DB', validation_df, mask=found)
         
         # 4. Companies NOT found in database
-        not_found_companies = validation_df[validation_df['DB_Found'] == 'No'].copy()
-        if len(not_found_companies) > 0:
-            not_found_companies.to_excel(writer, sheet_name='Companies_Not_In_DB', index=False)
+        if not_found.any():
+            writer.write_sheet('Companies_Not_In_DB', validation_df, mask=not_found)
         
         # 5. Company ticker list with validation status
-        ticker_summary = validation_df[['Russell3000_Company', 'Russell3000_Ticker', 'DB_Found', 'DB_Company_Name', 'DB_Proposal_Count', 'Validation_Status']].copy()
-        ticker_summary.to_excel(writer, sheet_name='Ticker_Validation_Summary', index=False)
+        writer.write_sheet('Ticker_Validation_Summary', validation_df, columns=[
+            'Russell3000_Company', 'Russell3000_Ticker', 'DB_Found', 'DB_Company_Name', 'DB_Proposal_Count', 'Validation_Status'])
         
         # 6. Database companies with Russell3000 mapping
-        if len(found_companies) > 0:
-            db_mapping = found_companies[['DB_Company_ID', 'DB_Company_Name', 'DB_Country', 'Russell3000_Company', 'Russell3000_Ticker', 'DB_Proposal_Count', 'DB_Category']].copy()
-            db_mapping.to_excel(writer, sheet_name='Database_Companies_Mapping', index=False)
+        if found.any():
+            writer.write_sheet('Database_Companies_Mapping', validation_df, mask=found, columns=[
+                'DB_Company_ID', 'DB_Company_Name', 'DB_Country', 'Russell3000_Company', 'Russell3000_Ticker', 'DB_Proposal_Count', 'DB_Category'])
     
     print(f"✅ Focused validation results exported to {output_file}")
 
+def run_report(russell_df, db_df):
+    """Validate, report and export (everything after the input and database reads)"""
+    if PARALLEL_VALIDATION:
+        validation_df = run_sharded(validate_russell3000_against_db,
+                                    russell_df, normalize_tickers(russell_df['Ticker']),
+                                    db_df, normalize_tickers(db_df['company_ticker']))
+    else:
+        validation_df = validate_russell3000_against_db(russell_df, db_df)
+    generate_focused_report(validation_df)
+    export_focused_results(validation_df)
+    return validation_df
+
 def main():
     """Main execution function"""
     print("🎯 Starting Focused Validation: Russell3000 vs Database Companies...")
@@ -292,23 +290,17 @@ def main():
         db_df = fetch_db_companies_with_details(conn)
         if db_df is None:
             print("❌ Cannot proceed without database data")
-            conn.close()
+            release_connection(conn)
             return
         
         print(f"✅ Fetched {len(db_df)} records from database")
         
-        # ===== 4. Validate Russell3000 Against Database =====
-        validation_df = validate_russell3000_against_db(russell_df, db_df)
-        
-        # ===== 5. Generate Focused Report =====
-        generate_focused_report(validation_df)
-        
-        # ===== 6. Export Focused Results =====
-        export_focused_results(validation_df)
+        # ===== 4. Validate, Report and Export =====
+        run_report(russell_df, db_df)
         
-        # ===== 7. Cleanup =====
-        conn.close()
-        print("✅ Database connection closed")
+        # ===== 5. Cleanup =====
+        release_connection(conn)
+        print("✅ Database connection released")
         
         print("\n🎉 Focused validation completed successfully!")
         print(f"\n📁 Results saved to: {output_file}")
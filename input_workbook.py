@@ -0,0 +1,114 @@
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+import ticker_normalize
+
+# ===== CONFIGURATION =====
+DEFAULT_SIDECAR_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.zmh_cache', 'workbooks')
+NORMALIZED_TICKER = '__normalized_ticker__'   # sidecar-only column, renamed or dropped on load
+SIDECAR_VERSION = 2
+
+
+def _file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _normalizer_fingerprint():
+    """Changes whenever the ticker-normalization settings do, so sidecars get rebuilt"""
+    settings = (ticker_normalize.EXCHANGE_SUFFIXES, sorted(ticker_normalize.TICKER_ALIASES.items()))
+    return hashlib.sha1(repr(settings).encode()).hexdigest()
+
+
+def _sidecar_paths(path, sheet_name, sidecar_dir):
+    source = os.path.abspath(path)
+    stem = os.path.splitext(os.path.basename(source))[0]
+    tag = hashlib.sha1(f"{source}|{sheet_name}".encode()).hexdigest()[:12]
+    base = os.path.join(sidecar_dir, f"{stem}-{tag}")
+    return base + '.parquet', base + '.json'
+
+
+def _parse_date_columns(df):
+    """Convert text 'date' columns to datetimes when every value parses (otherwise leave them as read)"""
+    for column in df.columns:
+        values = df[column]
+        if 'date' not in str(column).lower() or not (
+                pd.api.types.is_object_dtype(values) or pd.api.types.is_string_dtype(values)):
+            continue
+        parsed = pd.to_datetime(values, errors='coerce')
+        if parsed.notna().sum() == values.notna().sum():
+            df[column] = parsed
+    return df
+
+
+def _build_sidecar(path, sheet_name, ticker_column, parquet_path, manifest_path, manifest):
+    df = _parse_date_columns(pd.read_excel(path, sheet_name=sheet_name))
+    if ticker_column in df.columns:
+        df[NORMALIZED_TICKER] = ticker_normalize.normalize_tickers(df[ticker_column])
+    try:
+        os.makedirs(os.path.dirname(parquet_path), exist_ok=True)
+        df.to_parquet(parquet_path + '.tmp', index=False)
+        os.replace(parquet_path + '.tmp', parquet_path)
+        with open(manifest_path, 'w') as f:
+            json.dump(manifest, f)
+    except (OSError, ValueError, TypeError) as e:
+        # Columns pyarrow can't type (e.g. mixed text/numbers) - the workbook is re-read next time
+        print(f"⚠️ Could not write input sidecar ({e}); reading the workbook directly")
+    return df
+
+
+def read_input_workbook(path, sheet_name=0, ticker_column='Ticker', normalized_ticker_column=None,
+                        sidecar_dir=DEFAULT_SIDECAR_DIR, refresh=False):
+    """Read an input workbook through a Parquet sidecar cache.
+
+    The first read parses the workbook with openpyxl and stores a typed
+    Parquet copy (date columns parsed, ticker_column normalized). Later
+    reads load the sidecar while the workbook's size and mtime are
+    unchanged; if only the mtime moved, a content hash decides whether to
+    rebuild. Pass normalized_ticker_column to get the normalized tickers
+    as an extra column under that name.
+    """
+    parquet_path, manifest_path = _sidecar_paths(path, sheet_name, sidecar_dir)
+    stat = os.stat(path)
+    manifest = {
+        'version': SIDECAR_VERSION,
+        'ticker_column': ticker_column,
+        'normalizer': _normalizer_fingerprint(),
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+    }
+
+    cached = None
+    if not refresh and os.path.exists(parquet_path) and os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            stored = json.load(f)
+        settings = ('version', 'ticker_column', 'normalizer', 'size')
+        if all(stored.get(key) == manifest[key] for key in settings):
+            if stored.get('mtime_ns') == manifest['mtime_ns']:
+                cached = stored
+            elif stored.get('sha256') == _file_digest(path):
+                # Touched but not changed: keep the sidecar, remember the new mtime
+                cached = dict(stored, mtime_ns=manifest['mtime_ns'])
+                with open(manifest_path, 'w') as f:
+                    json.dump(cached, f)
+
+    if cached is not None:
+        df = pd.read_parquet(parquet_path)
+    else:
+        print(f"📦 Building input sidecar for {os.path.basename(path)}")
+        manifest['sha256'] = _file_digest(path)
+        df = _build_sidecar(path, sheet_name, ticker_column, parquet_path, manifest_path, manifest)
+
+    if NORMALIZED_TICKER in df.columns:
+        if normalized_ticker_column:
+            tickers = df.pop(NORMALIZED_TICKER)
+            df[normalized_ticker_column] = tickers.astype(object).where(tickers.notna(), None)
+        else:
+            df = df.drop(columns=NORMALIZED_TICKER)
+    return df
@@ -0,0 +1,174 @@
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+# ===== CONFIGURATION =====
+BENCHMARK_MEETINGS = 1_000_000
+BENCHMARK_COMPANIES = 50_000
+BENCHMARK_QUERIES = 1_000
+
+
+def _timestamp(value):
+    return None if value is None else np.datetime64(pd.Timestamp(value).as_unit('ns').to_datetime64())
+
+
+class MeetingCalendar:
+    """Sorted meeting dates of a frame's rows, answering window queries by binary search.
+
+    Building it sorts the dates once (rows without a date are left out);
+    every query afterwards is a searchsorted over that array. Queries
+    return positions into the source frame: window() in date order,
+    select()/mask() in the frame's own order. Ties on a date keep source
+    order, so first()/last() pick the same rows as nsmallest/nlargest.
+    Given a company column, meetings are also grouped per company
+    (offsets into one company-then-date ordering) for company_window()
+    and nearest().
+    """
+
+    def __init__(self, dates, companies=None, index=None):
+        dates = pd.to_datetime(pd.Series(dates), errors='coerce').to_numpy().astype('datetime64[ns]')
+        self.size = len(dates)
+        self.index = pd.RangeIndex(self.size) if index is None else index
+        valid = np.flatnonzero(~np.isnat(dates))
+        order = valid[np.argsort(dates[valid], kind='stable')]
+        self.rows = order
+        self.dates = dates[order]
+
+        self.companies = None
+        if companies is not None:
+            codes, uniques = pd.factorize(pd.Series(companies).astype(object))
+            self.companies = pd.Index(uniques)
+            known = valid[codes[valid] >= 0]
+            by_company = known[np.lexsort((dates[known], codes[known]))]
+            self.company_rows = by_company
+            self.company_dates = dates[by_company]
+            self.offsets = np.searchsorted(codes[by_company], np.arange(len(self.companies) + 1))
+
+    @classmethod
+    def from_frame(cls, df, date_column, company_column=None):
+        return cls(df[date_column], df[company_column] if company_column else None, index=df.index)
+
+    def labels(self, rows):
+        """Source index labels of rows (for .loc on frames filtered from the source)"""
+        return self.index[rows]
+
+    @staticmethod
+    def _bounds(dates, start, end, inclusive):
+        lo = 0 if start is None else np.searchsorted(
+            dates, _timestamp(start), side='left' if inclusive in ('both', 'left') else 'right')
+        hi = len(dates) if end is None else np.searchsorted(
+            dates, _timestamp(end), side='right' if inclusive in ('both', 'right') else 'left')
+        return lo, max(lo, hi)
+
+    def window(self, start=None, end=None, inclusive='left'):
+        """Rows dated between start and end (None = unbounded), in date order.
+
+        inclusive is 'left' (start <= date < end, the default), 'both',
+        'right' or 'neither', as in Series.between.
+        """
+        lo, hi = self._bounds(self.dates, start, end, inclusive)
+        return self.rows[lo:hi]
+
+    def count(self, start=None, end=None, inclusive='left'):
+        """Number of rows in the window, without materializing it"""
+        lo, hi = self._bounds(self.dates, start, end, inclusive)
+        return hi - lo
+
+    def select(self, start=None, end=None, inclusive='left'):
+        """window() in the source frame's row order, for df.iloc"""
+        return np.sort(self.window(start, end, inclusive))
+
+    def mask(self, start=None, end=None, inclusive='left'):
+        """Boolean array over the source rows: True inside the window"""
+        mask = np.zeros(self.size, dtype=bool)
+        mask[self.window(start, end, inclusive)] = True
+        return mask
+
+    def rolling(self, days, start=None):
+        """Rows in the next `days` days from start (default: today)"""
+        start = pd.Timestamp.today().normalize() if start is None else pd.Timestamp(start)
+        return self.window(start, start + pd.Timedelta(days=days))
+
+    def first(self, n, start=None):
+        """The n earliest rows dated on/after start (nsmallest order)"""
+        lo, _ = self._bounds(self.dates, start, None, 'left')
+        return self.rows[lo:lo + n]
+
+    def last(self, n, end=None):
+        """The n latest rows dated before end, latest first (nlargest order: ties in source order)"""
+        _, hi = self._bounds(self.dates, None, end, 'left')
+        lo = max(0, hi - n)
+        if lo == hi:
+            return self.rows[lo:hi]
+        # Rows tied with the cutoff date compete for the last places; nlargest keeps the first of them
+        tie_lo = np.searchsorted(self.dates, self.dates[lo], side='left')
+        tie_hi = min(hi, np.searchsorted(self.dates, self.dates[lo], side='right'))
+        picked = np.concatenate([np.arange(tie_lo, tie_lo + tie_hi - lo), np.arange(tie_hi, hi)])
+        picked = picked[np.lexsort((self.rows[picked], -self.dates[picked].astype('int64')))]
+        return self.rows[picked]
+
+    def company_window(self, company, start=None, end=None, inclusive='left'):
+        """One company's rows dated between start and end, in date order"""
+        code = self.companies.get_indexer([company])[0]
+        if code < 0:
+            return self.company_rows[:0]
+        begin, stop = self.offsets[code], self.offsets[code + 1]
+        lo, hi = self._bounds(self.company_dates[begin:stop], start, end, inclusive)
+        return self.company_rows[begin + lo:begin + hi]
+
+    def nearest(self, company, when):
+        """The company's row dated closest to when (ties go to the earlier date), or -1"""
+        code = self.companies.get_indexer([company])[0]
+        if code < 0 or self.offsets[code] == self.offsets[code + 1]:
+            return -1
+        begin, stop = self.offsets[code], self.offsets[code + 1]
+        dates = self.company_dates[begin:stop]
+        when = _timestamp(when)
+        i = np.searchsorted(dates, when, side='left')
+        candidates = [j for j in (i - 1, i) if 0 <= j < len(dates)]
+        best = min(candidates, key=lambda j: (abs(dates[j] - when), dates[j]))
+        # Among rows sharing the best date, the first in source order
+        first = np.searchsorted(dates, dates[best], side='left')
+        return self.company_rows[begin + first]
+
+
+def benchmark(n_meetings=BENCHMARK_MEETINGS, n_companies=BENCHMARK_COMPANIES, queries=BENCHMARK_QUERIES):
+    """Window queries through the calendar vs boolean scans of the full frame"""
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        'company': rng.integers(0, n_companies, n_meetings),
+        'meeting_date': pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 730, n_meetings), unit='D'),
+    })
+    starts = pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 700, queries), unit='D')
+
+    start = time.perf_counter()
+    calendar = MeetingCalendar.from_frame(df, 'meeting_date', 'company')
+    build = time.perf_counter() - start
+
+    dates = df['meeting_date']
+    start = time.perf_counter()
+    scanned = [int(((dates >= s) & (dates < s + pd.Timedelta(days=30))).sum()) for s in starts]
+    scan = (time.perf_counter() - start) / queries
+
+    start = time.perf_counter()
+    indexed = [len(calendar.rolling(30, s)) for s in starts]
+    window = (time.perf_counter() - start) / queries
+
+    start = time.perf_counter()
+    for company, s in zip(rng.integers(0, n_companies, queries), starts):
+        calendar.nearest(company, s)
+    nearest = (time.perf_counter() - start) / queries
+
+    print(f"📊 Meeting calendar benchmark: {n_meetings:,} meetings, {n_companies:,} companies")
+    print(f"   build (sort once)        : {build:.2f}s")
+    print(f"   30-day window, full scan : {scan * 1000:8.3f} ms/query")
+    print(f"   30-day window, calendar  : {window * 1000:8.3f} ms/query"
+          f"{'' if scanned == indexed else '  ⚠️ counts differ'}")
+    print(f"   nearest meeting (company): {nearest * 1000:8.3f} ms/query")
+
+
+if __name__ == "__main__":
+    if '--benchmark' in sys.argv:
+        benchmark()
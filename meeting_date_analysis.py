@@ -1,33 +1,49 @@
+import contextlib
+import io
+import json
+import sys
+import time
+
 import pandas as pd
-import psycopg2
 from datetime import datetime, date
 import warnings
 warnings.filterwarnings('ignore')
 
-# ===== CONFIGURATION =====
-# Database credentials
-DB_CONFIG = {
-       // Please Add DB Creds
-}
+from db import get_connection, release_connection
+from meeting_calendar import MeetingCalendar
+from query_cache import QueryCache, cached_query
+from report_writer import StreamingReportWriter
 
+# ===== CONFIGURATION =====
 # Output file   
 output_file = "Shareholder_Meetings_2025_Analysis.xlsx"
 
+# Serve unchanged query results from the local result cache (run with --refresh to re-query)
+USE_QUERY_CACHE = True
+FORCE_REFRESH = '--refresh' in sys.argv
+
+# 'detail' fetches every filing row and writes the per-filing sheets; 'aggregate' has the
+# database compute the summary, categories and top-10 lists only (run with --aggregate)
+REPORT_MODE = 'aggregate' if '--aggregate' in sys.argv else 'detail'
+
 def connect_to_db():
-    """Establish database connection"""
+    """Check out a pooled database connection"""
     try:
-        conn = psycopg2.connect(**DB_CONFIG)
-        conn.autocommit = True
-        return conn
+        return get_connection()
     except Exception as e:
         print(f"❌ Database connection failed: {e}")
         return None
 
+# Columns this report reads from the sp_def14a fetch (report_pipeline fetches their union once)
+DB_COLUMNS = [
+    'company_id', 'company_name', 'company_ticker', 'country', 'proposal_num', 'proposal_name',
+    'filing_date', 'vote_outcome', 'percentage_support', 'proxy_season', 'year', 'category',
+    'sub_category', 'proponent', 'outcome_percentage',
+]
+
 def fetch_company_meeting_data(conn):
     """Fetch company data with filing dates for 2025 proxy season"""
     try:
-        cursor = conn.cursor()
-        
         # Query to get companies with 2025 filing dates
         query = """
             SELECT DISTINCT
@@ -53,20 +69,115 @@ def fetch_company_meeting_data(conn):
             ORDER BY s.filing_date, c.symbol;
         """
         
-        cursor.execute(query)
-        results = cursor.fetchall()
-        
-        # Convert to DataFrame
-        columns = [desc[0] for desc in cursor.description]
-        db_df = pd.DataFrame(results, columns=columns)
-        
-        cursor.close()
+        cache = QueryCache(refresh=FORCE_REFRESH) if USE_QUERY_CACHE else None
+        db_df = cached_query(conn, query, cache=cache)
         return db_df
         
     except Exception as e:
         print(f"❌ Database query failed: {e}")
         return None
 
+# The same DISTINCT filing rows fetch_company_meeting_data pulls, kept on the server
+FILINGS_CTE = """
+    WITH filings AS (
+        SELECT DISTINCT
+            c.id AS company_id,
+            c.name AS company_name,
+            c.symbol AS company_ticker,
+            c.country,
+            s.proposal_num,
+            s.proposal_name,
+            s.filing_date,
+            s.vote_outcome,
+            s.percentage_support,
+            s.proxy_season,
+            s.year,
+            s.category,
+            s.sub_category,
+            s.proponent,
+            s.outcome_percentage
+        FROM public.sp_def14a s
+        LEFT JOIN public.company c ON s.company_id = c.id
+        WHERE s.proxy_season = 2025
+            AND s.filing_date IS NOT NULL
+    )
+"""
+
+# Every aggregate in one statement, so the DISTINCT filing set is built once. The past/upcoming
+# split uses the client's date (passed in) so results match the detail report; each part comes
+# back as a small JSON document.
+AGGREGATE_QUERY = FILINGS_CTE + """
+    SELECT
+        (SELECT row_to_json(t)::text FROM (
+            SELECT
+                count(*) FILTER (WHERE filing_date <= %(today)s) AS past_count,
+                min(filing_date) FILTER (WHERE filing_date <= %(today)s) AS past_first,
+                max(filing_date) FILTER (WHERE filing_date <= %(today)s) AS past_last,
+                count(*) FILTER (WHERE filing_date > %(today)s) AS upcoming_count,
+                min(filing_date) FILTER (WHERE filing_date > %(today)s) AS upcoming_first,
+                max(filing_date) FILTER (WHERE filing_date > %(today)s) AS upcoming_last
+            FROM filings
+        ) t) AS summary,
+        (SELECT json_agg(t ORDER BY t.filing_date DESC, t.company_ticker)::text FROM (
+            SELECT company_name, company_ticker, filing_date, %(today)s::date - filing_date AS days
+            FROM filings
+            WHERE filing_date <= %(today)s
+            ORDER BY filing_date DESC, company_ticker
+            LIMIT %(limit)s
+        ) t) AS recent,
+        (SELECT json_agg(t ORDER BY t.filing_date, t.company_ticker)::text FROM (
+            SELECT company_name, company_ticker, filing_date, filing_date - %(today)s::date AS days
+            FROM filings
+            WHERE filing_date > %(today)s
+            ORDER BY filing_date, company_ticker
+            LIMIT %(limit)s
+        ) t) AS next,
+        (SELECT json_agg(t ORDER BY t.filings DESC, t.first_filed, t.category)::text FROM (
+            SELECT category, count(*) AS filings, min(filing_date) AS first_filed
+            FROM filings
+            WHERE category IS NOT NULL
+            GROUP BY category
+            ORDER BY count(*) DESC, min(filing_date), category
+            LIMIT %(limit)s
+        ) t) AS top_categories,
+        -- Tickers listed in order of first filing, as the pandas groupby/unique version did
+        (SELECT json_agg(t ORDER BY t.category COLLATE "C", t.sub_category COLLATE "C")::text FROM (
+            SELECT category, sub_category,
+                   sum(named_filings)::bigint AS company_name,
+                   string_agg(company_ticker, ', ' ORDER BY first_filed, company_ticker) AS company_ticker
+            FROM (
+                SELECT category, sub_category, company_ticker,
+                       count(company_name) AS named_filings, min(filing_date) AS first_filed
+                FROM filings
+                WHERE category IS NOT NULL AND sub_category IS NOT NULL
+                GROUP BY category, sub_category, company_ticker
+            ) ticker_filings
+            GROUP BY category, sub_category
+        ) t) AS categories
+"""
+
+AGGREGATE_COLUMNS = {
+    'recent': ['company_name', 'company_ticker', 'filing_date', 'days'],
+    'next': ['company_name', 'company_ticker', 'filing_date', 'days'],
+    'top_categories': ['category', 'filings', 'first_filed'],
+    'categories': ['category', 'sub_category', 'company_name', 'company_ticker'],
+}
+
+def fetch_aggregates(conn, current_date, limit=10):
+    """One aggregate query; only summary-sized results come back"""
+    cache = QueryCache(refresh=FORCE_REFRESH) if USE_QUERY_CACHE else None
+    row = cached_query(conn, AGGREGATE_QUERY, {'today': current_date, 'limit': limit}, cache=cache).iloc[0]
+    
+    summary = pd.Series(json.loads(row['summary']))
+    for column in ('past_first', 'past_last', 'upcoming_first', 'upcoming_last'):
+        summary[column] = pd.to_datetime(summary[column])
+    aggregates = {'summary': summary}
+    for name, columns in AGGREGATE_COLUMNS.items():
+        aggregates[name] = pd.DataFrame(json.loads(row[name] or '[]'), columns=columns)
+    for name in ('recent', 'next'):
+        aggregates[name]['filing_date'] = pd.to_datetime(aggregates[name]['filing_date'])
+    return aggregates
+
 def analyze_meeting_dates(db_df):
     """Analyze filing dates and categorize companies"""
     
@@ -83,13 +194,15 @@ def analyze_meeting_dates(db_df):
     
     if len(valid_filings) == 0:
         print("❌ No companies found with filing dates in 2025")
-        return None, None
+        return None, None, None
     
     print(f"✅ Found {len(valid_filings)} companies with 2025 filing dates")
     
-    # Categorize filings
-    past_filings = valid_filings[valid_filings['filing_date'].dt.date <= current_date].copy()
-    upcoming_filings = valid_filings[valid_filings['filing_date'].dt.date > current_date].copy()
+    # Categorize filings: past is anything filed up to the end of today
+    calendar = MeetingCalendar.from_frame(valid_filings, 'filing_date')
+    tomorrow = pd.Timestamp(current_date) + pd.Timedelta(days=1)
+    past_filings = valid_filings.iloc[calendar.select(end=tomorrow)].copy()
+    upcoming_filings = valid_filings.iloc[calendar.select(start=tomorrow)].copy()
     
     # Add filing status
     past_filings['Filing_Status'] = 'Past'
@@ -106,10 +219,13 @@ def analyze_meeting_dates(db_df):
     except:
         upcoming_filings['Days_Until_Filing'] = 0
     
-    return past_filings, upcoming_filings
+    return past_filings, upcoming_filings, calendar
 
-def generate_meeting_report(past_filings, upcoming_filings):
-    """Generate comprehensive filing report"""
+def generate_meeting_report(past_filings, upcoming_filings, calendar=None):
+    """Generate comprehensive filing report (calendar: analyze_meeting_dates' index over both)"""
+    if calendar is None:
+        calendar = MeetingCalendar.from_frame(pd.concat([past_filings, upcoming_filings]), 'filing_date')
+    tomorrow = pd.Timestamp(date.today()) + pd.Timedelta(days=1)
     
     print("\n" + "="*80)
     print("📊 PROXY FILING ANALYSIS - 2025 SEASON")
@@ -122,7 +238,7 @@ def generate_meeting_report(past_filings, upcoming_filings):
         print(f"   Date Range: {past_filings['filing_date'].min().strftime('%Y-%m-%d')} to {past_filings['filing_date'].max().strftime('%Y-%m-%d')}")
         
         # Show recent filings
-        recent_filings = past_filings.nlargest(10, 'filing_date')
+        recent_filings = past_filings.loc[calendar.labels(calendar.last(10, end=tomorrow))]
         print(f"\n   Recent Filings (Last 10):")
         for _, filing in recent_filings.iterrows():
             days_ago = filing['Days_Since_Filing']
@@ -137,7 +253,7 @@ def generate_meeting_report(past_filings, upcoming_filings):
         print(f"   Date Range: {upcoming_filings['filing_date'].min().strftime('%Y-%m-%d')} to {upcoming_filings['filing_date'].max().strftime('%Y-%m-%d')}")
         
         # Show next filings
-        next_filings = upcoming_filings.nsmallest(10, 'filing_date')
+        next_filings = upcoming_filings.loc[calendar.labels(calendar.first(10, start=tomorrow))]
         print(f"\n   Next Filings (Next 10):")
         for _, filing in next_filings.iterrows():
             days_until = filing['Days_Until_Filing']
@@ -166,7 +282,7 @@ def export_meeting_data(past_filings, upcoming_filings):
     
     print(f"\n💾 Exporting data to {output_file}...")
     
-    with pd.ExcelWriter(output_file, engine='openpyxl') as writer:
+    with StreamingReportWriter(output_file) as writer:
         
         # 1. Summary sheet
         summary_data = {
@@ -185,64 +301,187 @@ def export_meeting_data(past_filings, upcoming_filings):
                 datetime.now().strftime('%Y-%m-%d %H:%M:%S')
             ]
         }
-        pd.DataFrame(summary_data).to_excel(writer, sheet_name='Summary', index=False)
+        writer.write_sheet('Summary', pd.DataFrame(summary_data))
         
         # 2. Past filings sheet
         if len(past_filings) > 0:
-            past_export = past_filings[[
+            writer.write_sheet('Past_Filings_2025', past_filings, columns=[
                 'company_name', 'company_ticker', 'country', 'filing_date',
                 'Days_Since_Filing', 'Filing_Status', 'proposal_name', 'category', 'sub_category'
-            ]].copy()
-            past_export.columns = [
+            ], headers=[
                 'Company Name', 'Ticker', 'Country', 'Filing Date', 
                 'Days Since Filing', 'Status', 'Proposal', 'Category', 'Sub-Category'
-            ]
-            past_export.to_excel(writer, sheet_name='Past_Filings_2025', index=False)
+            ])
         
         # 3. Upcoming filings sheet
         if len(upcoming_filings) > 0:
-            upcoming_export = upcoming_filings[[
+            writer.write_sheet('Upcoming_Filings_2025', upcoming_filings, columns=[
                 'company_name', 'company_ticker', 'country', 'filing_date',
                 'Days_Until_Filing', 'Filing_Status', 'proposal_name', 'category', 'sub_category'
-            ]].copy()
-            upcoming_export.columns = [
+            ], headers=[
                 'Company Name', 'Ticker', 'Country', 'Filing Date', 
                 'Days Until Filing', 'Status', 'Proposal', 'Category', 'Sub-Category'
-            ]
-            upcoming_export.to_excel(writer, sheet_name='Upcoming_Filings_2025', index=False)
+            ])
         
-        # 4. All filings sheet (combined)
         if len(past_filings) > 0 or len(upcoming_filings) > 0:
-            all_filings = pd.concat([past_filings, upcoming_filings], ignore_index=True)
-            all_export = all_filings[[
+            # 4. All filings sheet (past then upcoming, written back to back)
+            writer.write_sheet('All_Filings_2025', [past_filings, upcoming_filings], columns=[
                 'company_name', 'company_ticker', 'country', 'filing_date',
                 'Filing_Status', 'proposal_name', 'category', 'sub_category', 'vote_outcome', 'percentage_support'
-            ]].copy()
-            all_export.columns = [
+            ], headers=[
                 'Company Name', 'Ticker', 'Country', 'Filing Date', 
                 'Status', 'Proposal', 'Category', 'Sub-Category', 'Vote Outcome', 'Support %'
-            ]
-            all_export.to_excel(writer, sheet_name='All_Filings_2025', index=False)
-        
-        # 5. Company ticker list (for easy reference)
-        if len(past_filings) > 0 or len(upcoming_filings) > 0:
-            all_filings = pd.concat([past_filings, upcoming_filings], ignore_index=True)
-            ticker_list = all_filings[['company_name', 'company_ticker', 'filing_date', 'Filing_Status']].drop_duplicates()
-            ticker_list.columns = ['Company Name', 'Ticker', 'Filing Date', 'Status']
-            ticker_list.to_excel(writer, sheet_name='Company_Ticker_List', index=False)
-        
-        # 6. Category analysis sheet
-        if len(past_filings) > 0 or len(upcoming_filings) > 0:
+            ])
+            
+            # 5. Company ticker list (for easy reference)
+            ticker_columns = ['company_name', 'company_ticker', 'filing_date', 'Filing_Status']
             all_filings = pd.concat([past_filings, upcoming_filings], ignore_index=True)
+            ticker_list = all_filings[ticker_columns].drop_duplicates()
+            writer.write_sheet('Company_Ticker_List', ticker_list,
+                               headers=['Company Name', 'Ticker', 'Filing Date', 'Status'])
+            
+            # 6. Category analysis sheet
             category_analysis = all_filings.groupby(['category', 'sub_category']).agg({
                 'company_name': 'count',
                 'company_ticker': lambda x: ', '.join(x.unique())
             }).reset_index()
-            category_analysis.columns = ['Category', 'Sub-Category', 'Count', 'Companies']
-            category_analysis.to_excel(writer, sheet_name='Category_Analysis', index=False)
+            writer.write_sheet('Category_Analysis', category_analysis,
+                               headers=['Category', 'Sub-Category', 'Count', 'Companies'])
     
     print(f"✅ Data exported successfully to {output_file}")
 
+def run_report(db_df):
+    """Analyze, report and export; returns False when there are no filings to report"""
+    print("\n🔍 Analyzing filing dates...")
+    past_filings, upcoming_filings, calendar = analyze_meeting_dates(db_df)
+    
+    if past_filings is None:
+        print("❌ No filing data to analyze")
+        return False
+    
+    print("\n📊 Generating filing report...")
+    generate_meeting_report(past_filings, upcoming_filings, calendar)
+    export_meeting_data(past_filings, upcoming_filings)
+    return True
+
+def generate_aggregate_report(aggregates):
+    """generate_meeting_report from the database-side aggregates"""
+    summary = aggregates['summary']
+    past_count, upcoming_count = int(summary['past_count']), int(summary['upcoming_count'])
+    
+    print("\n" + "="*80)
+    print("📊 PROXY FILING ANALYSIS - 2025 SEASON")
+    print("="*80)
+    
+    if past_count > 0:
+        print(f"\n📅 PAST FILINGS (Jan 1, 2025 to {date.today()}):")
+        print(f"   Total Companies: {past_count}")
+        print(f"   Date Range: {summary['past_first'].strftime('%Y-%m-%d')} to {summary['past_last'].strftime('%Y-%m-%d')}")
+        print(f"\n   Recent Filings (Last 10):")
+        for _, filing in aggregates['recent'].iterrows():
+            print(f"     - {filing['company_name']} ({filing['company_ticker']}) - {filing['filing_date'].strftime('%Y-%m-%d')} ({filing['days']} days ago)")
+    else:
+        print(f"\n📅 PAST FILINGS: No filings found from Jan 1, 2025 to {date.today()}")
+    
+    if upcoming_count > 0:
+        print(f"\n🔮 UPCOMING FILINGS ({date.today()} to Dec 31, 2025):")
+        print(f"   Total Companies: {upcoming_count}")
+        print(f"   Date Range: {summary['upcoming_first'].strftime('%Y-%m-%d')} to {summary['upcoming_last'].strftime('%Y-%m-%d')}")
+        print(f"\n   Next Filings (Next 10):")
+        for _, filing in aggregates['next'].iterrows():
+            print(f"     - {filing['company_name']} ({filing['company_ticker']}) - {filing['filing_date'].strftime('%Y-%m-%d')} (in {filing['days']} days)")
+    else:
+        print(f"\n🔮 UPCOMING FILINGS: No upcoming filings found from {date.today()} to Dec 31, 2025")
+    
+    total_filings = past_count + upcoming_count
+    print(f"\n📈 OVERALL STATISTICS:")
+    print(f"   Total Companies with 2025 Filings: {total_filings}")
+    print(f"   Past Filings: {past_count} ({(past_count/total_filings*100):.1f}%)")
+    print(f"   Upcoming Filings: {upcoming_count} ({(upcoming_count/total_filings*100):.1f}%)")
+    
+    print(f"\n📊 PROPOSAL CATEGORIES:")
+    for _, row in aggregates['top_categories'].iterrows():
+        print(f"   - {row['category']}: {row['filings']}")
+
+def export_aggregate_data(aggregates):
+    """Export the Summary and Category_Analysis sheets (no per-filing sheets in aggregate mode)"""
+    
+    print(f"\n💾 Exporting data to {output_file}...")
+    summary = aggregates['summary']
+    past_count, upcoming_count = int(summary['past_count']), int(summary['upcoming_count'])
+    
+    with StreamingReportWriter(output_file) as writer:
+        summary_data = {
+            'Metric': [
+                'Total Companies with 2025 Filings',
+                'Past Filings (Jan 1 to Today)',
+                'Upcoming Filings (Today to Dec 31)',
+                'Current Date',
+                'Analysis Date'
+            ],
+            'Value': [
+                past_count + upcoming_count,
+                past_count,
+                upcoming_count,
+                date.today().strftime('%Y-%m-%d'),
+                datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            ]
+        }
+        writer.write_sheet('Summary', pd.DataFrame(summary_data))
+        
+        if past_count + upcoming_count > 0:
+            writer.write_sheet('Category_Analysis', aggregates['categories'],
+                               headers=['Category', 'Sub-Category', 'Count', 'Companies'])
+    
+    print(f"✅ Data exported successfully to {output_file}")
+
+def run_aggregate_report(conn):
+    """Aggregate mode: the database buckets and groups, only summary rows are transferred"""
+    print("\n📥 Computing 2025 filing aggregates in the database...")
+    current_date = date.today()
+    print(f"📅 Current Date: {current_date}")
+    aggregates = fetch_aggregates(conn, current_date)
+    
+    summary = aggregates['summary']
+    if int(summary['past_count']) + int(summary['upcoming_count']) == 0:
+        print("❌ No companies found with filing dates in 2025")
+        return False
+    
+    print("\n📊 Generating filing report...")
+    generate_aggregate_report(aggregates)
+    export_aggregate_data(aggregates)
+    return True
+
+def benchmark(conn, repeats=3):
+    """Time detail mode's fetch + pandas bucketing/grouping against the aggregate queries (uncached)"""
+    global USE_QUERY_CACHE
+    USE_QUERY_CACHE = False   # time the database, not the result cache
+    current_date = date.today()
+    
+    def detail():
+        db_df = fetch_company_meeting_data(conn)
+        past_filings, upcoming_filings, _ = analyze_meeting_dates(db_df)
+        all_filings = pd.concat([past_filings, upcoming_filings], ignore_index=True)
+        all_filings.groupby(['category', 'sub_category']).agg({
+            'company_name': 'count',
+            'company_ticker': lambda x: ', '.join(x.unique())
+        })
+        return len(db_df)
+    
+    def aggregate():
+        fetch_aggregates(conn, current_date)
+        return 1   # one row of JSON documents
+    
+    print(f"📊 Filing report benchmark (best of {repeats})")
+    for name, fn in (('detail', detail), ('aggregate', aggregate)):
+        timings = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                rows = fn()
+            timings.append(time.perf_counter() - start)
+        print(f"   {name:<10} {min(timings):6.2f}s  {rows:>9,} rows transferred")
+
 def main():
     """Main execution function"""
     print("🚀 Starting Proxy Filing Analysis for 2025 Season...")
@@ -257,35 +496,38 @@ def main():
         
         print("✅ Database connection established")
         
-        # ===== 2. Fetch Filing Data =====
+        if '--benchmark' in sys.argv:
+            benchmark(conn)
+            release_connection(conn)
+            return
+        
+        # ===== 2. Aggregate Mode: Let the Database Summarize =====
+        if REPORT_MODE == 'aggregate':
+            completed = run_aggregate_report(conn)
+            release_connection(conn)
+            print("✅ Database connection released")
+            if completed:
+                print("\n🎉 Filing date analysis completed successfully!")
+            return
+        
+        # ===== 3. Fetch Filing Data =====
         print("\n📥 Fetching company filing data for 2025...")
         db_df = fetch_company_meeting_data(conn)
         if db_df is None:
             print("❌ Cannot proceed without database data")
-            conn.close()
+            release_connection(conn)
             return
         
         print(f"✅ Fetched {len(db_df)} records from database")
         
-        # ===== 3. Analyze Filing Dates =====
-        print("\n🔍 Analyzing filing dates...")
-        past_filings, upcoming_filings = analyze_meeting_dates(db_df)
-        
-        if past_filings is None:
-            print("❌ No filing data to analyze")
-            conn.close()
+        # ===== 4. Analyze, Report and Export =====
+        if not run_report(db_df):
+            release_connection(conn)
             return
         
-        # ===== 4. Generate Report =====
-        print("\n📊 Generating filing report...")
-        generate_meeting_report(past_filings, upcoming_filings)
-        
-        # ===== 5. Export Data =====
-        export_meeting_data(past_filings, upcoming_filings)
-        
-        # ===== 6. Cleanup =====
-        conn.close()
-        print("✅ Database connection closed")
+        # ===== 5. Cleanup =====
+        release_connection(conn)
+        print("✅ Database connection released")
         
         print("\n🎉 Filing date analysis completed successfully!")
         
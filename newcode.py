@@ -73,29 +73,21 @@
 #
 
 import pandas as pd
-import psycopg2
 
+from db import connection
+from input_workbook import read_input_workbook
+from ticker_normalize import normalize_tickers
 from Russell3000Validated import query
 
 # --- Config ---
 input_file = "Russell3000 Feb 2025(Upcoming shareholder meeting).xlsx"
 output_file = "Prod_Validation_Current_Date_Past_2025_2024_Finalize_Russell3000_DB_Output_MeetingDate.xlsx"
-DB_CONFIG = {
-    #   // Please Add DB Creds
-}
 
 # --- Load Excel ---
-df = pd.read_excel(input_file)
+df = read_input_workbook(input_file)
 
 # Clean tickers like ABCD-US -> ABCD (and handle -us, -NYQ, etc.)
-tickers = (
-    df['Ticker'].astype(str)
-      .str.replace(r'-[A-Za-z.]+$', '', regex=True)
-      .str.strip()
-      .dropna()
-      .unique()
-      .tolist()
-)
+tickers = normalize_tickers(df['Ticker']).dropna().unique().tolist()
 
 print(f"Tickers to query ({len(tickers)}): {tickers[:20]}{'...' if len(tickers)>20 else ''}")
 
@@ -133,7 +125,7 @@ ORDER BY hmd.meeting_date;
 """
 
 # --- Query DB safely ---
-with psycopg2.connect(**DB_CONFIG) as conn:
+with connection() as conn:
     with conn.cursor() as cur:
         cur.execute(query, tickers)
         rows = cur.fetchall()
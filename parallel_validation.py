@@ -0,0 +1,139 @@
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+import zlib
+from multiprocessing import get_context
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+# ===== CONFIGURATION =====
+DEFAULT_WORKERS = os.cpu_count() or 1
+SHARDS_PER_WORKER = 2            # more shards than workers evens out skewed tickers
+MIN_PARALLEL_ROWS = 20_000       # smaller inputs validate faster in-process than a pool starts
+ROW_POSITION = '__row__'         # input position carried through the shards to restore order
+
+
+def ticker_shards(tickers, n_shards):
+    """Shard number per ticker: crc32 of the normalized ticker (stable across processes, unlike hash())"""
+    codes, uniques = pd.factorize(pd.Series(tickers).astype(object), use_na_sentinel=True)
+    unique_shards = np.array([zlib.crc32(str(ticker).encode('utf-8')) % n_shards for ticker in uniques] + [0],
+                             dtype=np.int64)
+    return unique_shards[codes]
+
+
+def write_shard_file(df, shards, n_shards, path):
+    """Write df as an Arrow IPC file holding exactly one record batch per shard (input order kept within each)"""
+    order = np.argsort(shards, kind='stable')
+    table = pa.Table.from_pandas(df.iloc[order], preserve_index=False)
+    counts = np.bincount(shards, minlength=n_shards)
+    with pa.OSFile(path, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        offset = 0
+        for count in counts:
+            part = table.slice(offset, count).combine_chunks()
+            batches = part.to_batches()
+            writer.write_batch(batches[0] if batches else pa.RecordBatch.from_pylist([], schema=table.schema))
+            offset += count
+
+
+def read_shard(path, shard):
+    """Memory-map the IPC file and read one shard's batch; nothing else in the file is touched"""
+    with pa.memory_map(path) as source:
+        return pa.ipc.open_file(source).get_batch(shard).to_pandas()
+
+
+def _validate_shard(task):
+    validator, shard, input_path, reference_path = task
+    input_df = read_shard(input_path, shard)
+    if input_df.empty:
+        return shard, None
+    positions = input_df.pop(ROW_POSITION).to_numpy()
+    reference_df = read_shard(reference_path, shard)
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = validator(input_df, reference_df)
+    result[ROW_POSITION] = positions
+    return shard, result
+
+
+def run_sharded(validator, input_df, input_keys, reference_df, reference_keys,
+                workers=DEFAULT_WORKERS, n_shards=None, min_rows=MIN_PARALLEL_ROWS):
+    """Run validator(input_shard, reference_shard) over ticker-hash shards in worker processes.
+
+    input_keys / reference_keys are the tickers the validator matches on;
+    rows with equal keys always land in the same shard, so each worker
+    gets its slice of the input plus only the reference rows it can match.
+    Both frames go through Arrow IPC files that the workers memory-map
+    (no pickling of the data), and the per-shard results come back
+    concatenated in input order with the input's index. validator must be
+    a module-level function returning one row per input row. With a
+    single worker, or fewer than min_rows input rows, it runs in-process.
+    """
+    if workers < 2 or len(input_df) < min_rows:
+        return validator(input_df, reference_df)
+
+    n_shards = n_shards or workers * SHARDS_PER_WORKER
+    original_index = input_df.index
+    input_df = input_df.reset_index(drop=True)
+    input_df[ROW_POSITION] = np.arange(len(input_df))
+
+    with tempfile.TemporaryDirectory(prefix='zmh_shards_') as directory:
+        input_path = os.path.join(directory, 'input.arrow')
+        reference_path = os.path.join(directory, 'reference.arrow')
+        try:
+            write_shard_file(input_df, ticker_shards(input_keys, n_shards), n_shards, input_path)
+            write_shard_file(reference_df, ticker_shards(reference_keys, n_shards), n_shards, reference_path)
+        except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+            # Columns Arrow can't type (e.g. mixed text/numbers): validate in-process instead
+            print(f"⚠️ Could not write validation shards ({e}); validating in-process")
+            return validator(input_df.drop(columns=ROW_POSITION).set_axis(original_index), reference_df)
+
+        tasks = [(validator, shard, input_path, reference_path) for shard in range(n_shards)]
+        print(f"🧩 Validating {len(input_df):,} rows in {n_shards} ticker shards with {workers} worker processes")
+        with get_context('spawn').Pool(workers) as pool:
+            results = [result for _, result in pool.imap_unordered(_validate_shard, tasks) if result is not None]
+
+    combined = pd.concat(results, ignore_index=True).sort_values(ROW_POSITION, kind='stable')
+    # Shards see different labels, so concat turns categoricals into object; re-encode them over all shards
+    categorical = [column for column, dtype in results[0].dtypes.items() if isinstance(dtype, pd.CategoricalDtype)]
+    combined[categorical] = combined[categorical].astype('category')
+    # Text columns passed through from the input come back from Arrow as str; keep them as they went in
+    passthrough = {column: dtype for column, dtype in input_df.dtypes.items()
+                   if dtype == object and column in combined.columns and combined[column].dtype != dtype}
+    combined = combined.astype(passthrough)
+    return combined.drop(columns=ROW_POSITION).set_axis(original_index)
+
+
+def benchmark(n_companies=300_000, worker_counts=(2, 4)):
+    """Time company_meeting_analysis.analyze_companies in-process vs sharded over worker processes"""
+    from company_meeting_analysis import analyze_companies, make_synthetic_inputs
+    from ticker_normalize import normalize_tickers
+
+    input_df, db_df = make_synthetic_inputs(n_companies)
+    input_keys = normalize_tickers(input_df['Ticker'])
+    db_keys = normalize_tickers(db_df['company_ticker'])
+    print(f"📊 Sharded validation benchmark: {n_companies:,} input rows / {len(db_df):,} DB rows, "
+          f"{os.cpu_count()} CPU cores")
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        serial = analyze_companies(input_df.copy(), db_df.copy())
+    print(f"   in-process           : {time.perf_counter() - start:6.2f}s")
+
+    for workers in worker_counts:
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            sharded = run_sharded(analyze_companies, input_df, input_keys, db_df, db_keys,
+                                  workers=workers, n_shards=workers * SHARDS_PER_WORKER, min_rows=0)
+        elapsed = time.perf_counter() - start
+        identical = sharded.equals(serial)
+        print(f"   {workers} workers, {workers * SHARDS_PER_WORKER} shards  : {elapsed:6.2f}s"
+              f"{'' if identical else '  ⚠️ output differs'}")
+
+
+if __name__ == "__main__":
+    if '--benchmark' in sys.argv:
+        benchmark()
@@ -0,0 +1,182 @@
+import gc
+import random
+import time
+from functools import lru_cache
+
+
+@lru_cache(maxsize=65536)
+def canonical_name(name):
+    """Normalize a proposal name: collapse whitespace and ignore case"""
+    if name is None:
+        return None
+    return ' '.join(str(name).split()).casefold()
+
+
+@lru_cache(maxsize=4096)
+def canonical_num(num):
+    """Normalize a proposal number so 3, '3' and ' 3 ' compare equal"""
+    if num is None:
+        return None
+    return str(num).strip()
+
+
+def match_key(ticker, proposal_num, proposal_name):
+    """Build the (ticker, proposal_num, canonical proposal name) lookup key"""
+    return ticker, canonical_num(proposal_num), canonical_name(proposal_name)
+
+
+def build_ticker_index(ticker, items):
+    """Index one ticker's voting_report_8k items by normalized key.
+
+    Returns (records, index) where records are the item records in report
+    order and index maps each key to the records carrying it.
+    """
+    records = []
+    index = {}
+    for item in items:
+        record = {
+            'ticker': ticker,
+            'proposal_name': item.get('proposal_name'),
+            'proposal_num': item.get('proposal_num')
+        }
+        records.append(record)
+        key = match_key(ticker, record['proposal_num'], record['proposal_name'])
+        index.setdefault(key, []).append(record)
+    return records, index
+
+
+def build_indexes(voting_reports):
+    """Build a ticker index for every usable voting report ({ticker: (records, index)})"""
+    return {
+        ticker: build_ticker_index(ticker, items)
+        for ticker, items in voting_reports.items()
+        if items and isinstance(items, list)
+    }
+
+
+def find_matches(indexes, ticker, proposal_num, proposal_name):
+    """Return the 8-K records matching a proposal (empty list when none)"""
+    entry = indexes.get(ticker)
+    if entry is None:
+        return []
+    return entry[1].get(match_key(ticker, proposal_num, proposal_name), [])
+
+
+def _unmatched_record(proposal):
+    return {
+        'ticker': proposal['company_ticker'],
+        'proposal_name': proposal['proposal_name'],
+        'proposal_num': proposal['proposal_num']
+    }
+
+
+def _nested_scan(proposals, voting_reports):
+    """Reference implementation mirroring the old process_proposals loop.
+
+    Tickers whose report is missing, empty or not a list are skipped (neither
+    matched nor unmatched), as the old `if url1_response and isinstance(...)`
+    guard did.
+    """
+    url1_results = []
+    matched = []
+    unmatched = []
+    for proposal in proposals:
+        ticker = proposal['company_ticker']
+        url1_response = voting_reports.get(ticker)
+        if not (url1_response and isinstance(url1_response, list)):
+            continue
+        found_match = False
+        for item in url1_response:
+            item_record = {
+                'ticker': ticker,
+                'proposal_name': item.get('proposal_name'),
+                'proposal_num': item.get('proposal_num')
+            }
+            url1_results.append(item_record)
+            if item.get('proposal_name') == proposal['proposal_name'] and item.get('proposal_num') == proposal['proposal_num']:
+                matched.append(item_record)
+                found_match = True
+        if not found_match:
+            unmatched.append(_unmatched_record(proposal))
+    return url1_results, matched, unmatched
+
+
+def _indexed_scan(proposals, voting_reports):
+    """Same as _nested_scan but resolved through the hash index, as testcompanysearchticket does"""
+    indexes = build_indexes(voting_reports)
+    url1_results = []
+    matched = []
+    unmatched = []
+    for proposal in proposals:
+        ticker = proposal['company_ticker']
+        if ticker not in indexes:
+            continue
+        url1_results.extend(indexes[ticker][0])
+        records = find_matches(indexes, ticker, proposal['proposal_num'], proposal['proposal_name'])
+        matched.extend(records)
+        if not records:
+            unmatched.append(_unmatched_record(proposal))
+    return url1_results, matched, unmatched
+
+
+def make_synthetic_corpus(n_proposals=100_000, proposals_per_ticker=12, seasons=5, seed=7):
+    """Generate def14a proposals and per-ticker 8-K reports.
+
+    Each ticker's report carries `seasons` proxy seasons of items, like the
+    voting_report_8k endpoint does; about 80% of current proposals match.
+    About 5% of tickers get no report, an empty one or an error payload
+    (a dict), which the matchers must skip.
+    """
+    rng = random.Random(seed)
+    proposals = []
+    voting_reports = {}
+    for i in range(n_proposals):
+        ticker = f"T{i // proposals_per_ticker:05d}"
+        num = i % proposals_per_ticker + 1
+        name = f"Proposal {num} on topic {rng.randint(1, 50)}"
+        proposals.append({'company_ticker': ticker, 'proposal_num': num, 'proposal_name': name})
+
+        report = voting_reports.setdefault(ticker, [])
+        for season in range(1, seasons):
+            report.append({'proposal_num': num, 'proposal_name': f"{name} ({2025 - season})"})
+        if rng.random() < 0.8:
+            report.append({'proposal_num': num, 'proposal_name': name})
+
+    unusable = (None, [], {'detail': 'Not found.'})
+    for ticker in sorted(voting_reports):
+        if rng.random() < 0.05:
+            voting_reports[ticker] = rng.choice(unusable)
+    return proposals, voting_reports
+
+
+def benchmark(n_proposals=100_000, seasons=(1, 5)):
+    """Compare nested-scan and indexed matching on synthetic corpora"""
+    for season_count in seasons:
+        proposals, voting_reports = make_synthetic_corpus(n_proposals, seasons=season_count)
+        items = sum(len(report) for report in voting_reports.values() if isinstance(report, list))
+        print(f"\n📊 Synthetic corpus: {len(proposals)} proposals, {len(voting_reports)} tickers, "
+              f"{items} report items ({season_count} season(s) per report)")
+
+        # Time with the cyclic GC paused (as timeit does) so collections of the
+        # large synthetic heap don't swamp the difference between the two loops
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            nested = _nested_scan(proposals, voting_reports)
+            nested_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            indexed = _indexed_scan(proposals, voting_reports)
+            indexed_time = time.perf_counter() - start
+        finally:
+            gc.enable()
+
+        print(f"   Nested scan : {nested_time:.3f}s ({len(proposals) / nested_time:,.0f} proposals/s)")
+        print(f"   Hash index  : {indexed_time:.3f}s ({len(proposals) / indexed_time:,.0f} proposals/s, incl. index build)")
+        print(f"   Matched: {len(indexed[1])}, Unmatched: {len(indexed[2])}")
+        print(f"   {'✅' if nested == indexed else '❌'} Match/unmatch sets identical: {nested == indexed}")
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,190 @@
+import contextlib
+import json
+import os
+import sqlite3
+
+from zmh_api import fetch_page, iter_pages, with_query
+
+# ===== CONFIGURATION =====
+DEFAULT_STORE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.zmh_cache', 'proposals.sqlite3')
+
+# Record field holding the last-modified timestamp and the API filter that selects
+# records changed since a timestamp. Set UPDATED_FIELD to None when the endpoint
+# has no such field; the sync then falls back to the highest id seen.
+UPDATED_FIELD = 'updated_at'
+UPDATED_FILTER = 'updated_at__gte'
+ID_FIELD = 'id'
+
+
+class ProposalStore:
+    """Local SQLite copy of def14a proposals keyed by proposal id, plus sync watermarks"""
+
+    def __init__(self, path=DEFAULT_STORE_PATH):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS proposals (id TEXT PRIMARY KEY, data TEXT NOT NULL)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS sync_state (name TEXT PRIMARY KEY, value TEXT)")
+        self._conn.commit()
+
+    def get_watermark(self, name):
+        row = self._conn.execute("SELECT value FROM sync_state WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else None
+
+    def set_watermark(self, name, value):
+        self._conn.execute("INSERT OR REPLACE INTO sync_state VALUES (?, ?)", (name, str(value)))
+
+    def max_id(self):
+        """Highest numeric proposal id in the store (0 when empty)"""
+        row = self._conn.execute("SELECT MAX(CAST(id AS INTEGER)) FROM proposals").fetchone()
+        return row[0] or 0
+
+    def upsert(self, proposals):
+        """Insert new proposals and replace changed ones; returns (inserted, updated)"""
+        inserted = updated = 0
+        for proposal in proposals:
+            proposal_id = str(proposal[ID_FIELD])
+            data = json.dumps(proposal, sort_keys=True, default=str)
+            existing = self._conn.execute("SELECT data FROM proposals WHERE id = ?", (proposal_id,)).fetchone()
+            if existing is None:
+                inserted += 1
+            elif existing[0] != data:
+                updated += 1
+            else:
+                continue
+            self._conn.execute("INSERT OR REPLACE INTO proposals VALUES (?, ?)", (proposal_id, data))
+        return inserted, updated
+
+    def commit(self):
+        self._conn.commit()
+
+    def rollback(self):
+        self._conn.rollback()
+
+    def all_proposals(self):
+        """Return every stored proposal, ordered by id"""
+        return [proposal for batch in self.iter_proposals() for proposal in batch]
+
+    def iter_proposals(self, batch_size=1000):
+        """Yield stored proposals in id order, batch_size at a time"""
+        cursor = self._conn.execute("SELECT data FROM proposals ORDER BY CAST(id AS INTEGER), id")
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                return
+            yield [json.loads(data) for (data,) in rows]
+
+    def count(self):
+        return self._conn.execute("SELECT COUNT(*) FROM proposals").fetchone()[0]
+
+    def close(self):
+        self._conn.close()
+
+
+def _iter_new_by_id(api_url, headers, session, last_id, max_workers=8):
+    """Walk the endpoint newest-id first, yielding unseen records page by page.
+
+    Stops at the first page already synced; a failed page yields None.
+    Stopping early is only safe if the API really sorts by descending id, so
+    every page is checked: if ids go up, the ordering was ignored and the
+    walk falls back to reading every page.
+    """
+    next_url = with_query(api_url, ordering=f"-{ID_FIELD}")
+    yielded = set()
+    previous_id = None
+
+    while next_url:
+        print(f"Fetching: {next_url}")
+        data = fetch_page(session, next_url, headers)
+        if not data or 'results' not in data:
+            print(f"❌ Unable to fetch or parse {next_url}")
+            yield None
+            return
+        page = data.get('results', [])
+        ids = [int(record[ID_FIELD]) for record in page]
+        if any(later > earlier for earlier, later in zip([previous_id, *ids], ids) if earlier is not None):
+            print(f"⚠️ API ignored ordering=-{ID_FIELD}; checking every page for new records")
+            for full_page in iter_pages(api_url, headers, max_workers=max_workers, session=session):
+                if full_page is None:
+                    yield None
+                    return
+                yield [record for record in full_page
+                       if int(record[ID_FIELD]) > last_id and int(record[ID_FIELD]) not in yielded]
+            return
+        fresh = [record for record in page if int(record[ID_FIELD]) > last_id]
+        yielded.update(int(record[ID_FIELD]) for record in fresh)
+        yield fresh
+        if len(fresh) < len(page):
+            return
+        previous_id = ids[-1] if ids else previous_id
+        next_url = data.get('next')
+
+
+@contextlib.contextmanager
+def _bypass_response_cache(session):
+    """Detach the session's response cache (if any) for the duration of the block"""
+    cache = getattr(session, 'response_cache', None)
+    session.response_cache = None
+    try:
+        yield
+    finally:
+        session.response_cache = cache
+
+
+def sync_proposals(store, api_url, headers, session, max_workers=8, full=False):
+    """Bring the local store up to date; returns the number of records fetched (None on failure).
+
+    A first run (or full=True) pulls everything. Later runs ask only for
+    records changed since the stored updated-timestamp watermark, or, when
+    the endpoint has no such field, for ids above the highest one stored
+    (which picks up new records but not edits to old ones). Pages are merged
+    as they arrive but committed together, so a failed page leaves the store
+    and watermarks untouched.
+
+    Every request goes to the API, never to the session's response cache:
+    the sync asks the same URLs again and again (an unchanged watermark, the
+    fixed newest-first listing), so a cached page is exactly the stale
+    answer that would hide new records.
+    """
+    with _bypass_response_cache(session):
+        return _sync(store, api_url, headers, session, max_workers, full)
+
+
+def _sync(store, api_url, headers, session, max_workers, full):
+    watermark = None if full else store.get_watermark('updated')
+    last_id = None if full else store.get_watermark('max_id')
+
+    if watermark and UPDATED_FIELD:
+        print(f"🔄 Incremental sync: records with {UPDATED_FIELD} >= {watermark}")
+        pages = iter_pages(with_query(api_url, **{UPDATED_FILTER: watermark}), headers,
+                           max_workers=max_workers, session=session)
+    elif last_id:
+        print(f"🔄 Incremental sync: records with {ID_FIELD} > {last_id}")
+        pages = _iter_new_by_id(api_url, headers, session, int(last_id), max_workers)
+    else:
+        print("🔄 Full sync: fetching the complete proposal history")
+        pages = iter_pages(api_url, headers, max_workers=max_workers, session=session)
+
+    fetched = inserted = updated = 0
+    for page in pages:
+        if page is None:
+            store.rollback()
+            print("❌ Sync incomplete - store and watermarks left unchanged")
+            return None
+        page_inserted, page_updated = store.upsert(page)
+        fetched += len(page)
+        inserted += page_inserted
+        updated += page_updated
+
+        updated_values = [record[UPDATED_FIELD] for record in page if UPDATED_FIELD and record.get(UPDATED_FIELD)]
+        if updated_values:
+            watermark = max([watermark, *updated_values]) if watermark else max(updated_values)
+
+    # Watermarks are written in the same transaction as the records
+    if watermark:
+        store.set_watermark('updated', watermark)
+    if fetched:
+        store.set_watermark('max_id', max(store.max_id(), int(last_id or 0)))
+    store.commit()
+
+    print(f"✅ Sync fetched {fetched} records: {inserted} new, {updated} changed, {store.count()} stored")
+    return fetched
@@ -0,0 +1,276 @@
+import contextlib
+import hashlib
+import io
+import json
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+
+import pandas as pd
+
+# ===== CONFIGURATION =====
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.zmh_cache', 'queries')
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024
+# Seconds a result is served at most, whatever the watermarks say (None: no limit)
+DEFAULT_MAX_AGE = 24 * 60 * 60
+
+# Optional per-table watermark queries, used instead of the statistics counters, e.g.
+# {'public.sp_def14a': "SELECT max(id), max(updated_at), count(*) FROM public.sp_def14a"}
+WATERMARK_QUERIES = {}
+
+# Results depending on these are never cached: the same SQL gives a different answer tomorrow
+VOLATILE_RE = re.compile(
+    r'\b(now|random|clock_timestamp|statement_timestamp|transaction_timestamp|timeofday'
+    r'|current_date|current_time|current_timestamp|localtime|localtimestamp|nextval|setval)\b',
+    re.IGNORECASE,
+)
+_LITERAL_RE = re.compile(r"('(?:[^']|'')*'|\"(?:[^\"]|\"\")*\")")
+
+# One round-trip for every table's write counters. pg_relation_filenode moves on
+# TRUNCATE and table rewrites, which the tuple counters don't see. A hot standby
+# doesn't count the writes it replays, so its counters can't be trusted.
+_WATERMARK_SQL = """
+    SELECT t.name, c.relkind, c.relpersistence, pg_relation_filenode(c.oid),
+           s.n_tup_ins, s.n_tup_upd, s.n_tup_del, current_setting('track_counts'), pg_is_in_recovery()
+    FROM unnest(%s::text[]) AS t(name)
+    LEFT JOIN pg_class c
+        ON c.oid = to_regclass(quote_ident(split_part(t.name, '.', 1)) || '.' || quote_ident(split_part(t.name, '.', 2)))
+    LEFT JOIN pg_stat_all_tables s ON s.relid = c.oid
+"""
+
+
+def normalize_sql(sql):
+    """Collapse whitespace and drop comments and the trailing semicolon, leaving quoted text alone"""
+    parts = _LITERAL_RE.split(sql)
+    for i in range(0, len(parts), 2):
+        code = re.sub(r'--[^\n]*', ' ', parts[i])
+        parts[i] = re.sub(r'\s+', ' ', code)
+    return ''.join(parts).strip().rstrip(';').strip()
+
+
+def fetch_frame(conn, query, params=None):
+    """cursor.fetchall() into a DataFrame (the uncached path)"""
+    with conn.cursor() as cur:
+        cur.execute(query, params)
+        rows = cur.fetchall()
+        columns = [desc[0] for desc in cur.description]
+    return pd.DataFrame(rows, columns=columns)
+
+
+def _plan_relations(plan, found):
+    if 'Relation Name' in plan:
+        found.add(f"{plan.get('Schema', 'public')}.{plan['Relation Name']}")
+    for child in plan.get('Plans', ()):
+        _plan_relations(child, found)
+    return found
+
+
+class QueryCache:
+    """On-disk cache of SELECT results as Parquet files.
+
+    Entries are keyed by the normalized statement (parameters inlined) and
+    the database it ran against. An entry is served only while the
+    watermarks of every table the plan reads are unchanged: one catalog
+    query per lookup compares the insert/update/delete counters from
+    pg_stat_all_tables (or a WATERMARK_QUERIES override). The server
+    publishes those counters up to ~10 seconds after a commit, so a result
+    fetched in that window can be served once more; tables that need exact
+    invalidation get a WATERMARK_QUERIES entry (max id / updated_at).
+
+    The counters are only meaningful on the primary: a hot-standby replica
+    doesn't update them for replayed writes, so on a connection where
+    pg_is_in_recovery() is true every counter-tracked query bypasses the
+    cache (WATERMARK_QUERIES tables read real data and still cache). As a
+    backstop for lagging or reset statistics, no entry is served once it is
+    older than max_age seconds; the query is re-run and the entry replaced.
+
+    Queries on temp tables or views, or using now()/random() and the like,
+    bypass the cache. Files are evicted least recently used first once the
+    store grows past max_bytes; refresh=True re-runs every query and
+    overwrites its entry.
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES, refresh=False,
+                 max_age=DEFAULT_MAX_AGE):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.refresh = refresh
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(os.path.join(directory, 'index.sqlite3'), check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS results (
+                key TEXT PRIMARY KEY,
+                statement TEXT NOT NULL,
+                tables TEXT NOT NULL,
+                watermarks TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                size INTEGER NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed_at)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(conn, statement):
+        """Hash the normalized statement together with the server and database it targets"""
+        dsn = conn.get_dsn_parameters()
+        scope = '|'.join(str(dsn.get(name, '')) for name in ('host', 'port', 'dbname', 'user'))
+        return hashlib.sha256(f"{scope}\n{normalize_sql(statement)}".encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.parquet")
+
+    @staticmethod
+    def relations(conn, statement):
+        """Tables the statement's plan reads (schema-qualified), or None if it can't be cached"""
+        with conn.cursor() as cur:
+            cur.execute(f"EXPLAIN (VERBOSE, FORMAT JSON) {statement}")
+            plan = cur.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        tables = sorted(_plan_relations(plan[0]['Plan'], set()))
+        if not tables or any(table.startswith('pg_temp') for table in tables):
+            return None
+        return tables
+
+    @staticmethod
+    def watermarks(conn, tables):
+        """Current watermark of each table, or None when one can't be tracked (or the server is a standby)"""
+        marks = {}
+        with conn.cursor() as cur:
+            cur.execute(_WATERMARK_SQL, ([table for table in tables if table not in WATERMARK_QUERIES],))
+            for name, relkind, persistence, filenode, inserted, updated, deleted, track_counts, standby \
+                    in cur.fetchall():
+                if relkind not in ('r', 'p', 'm') or persistence == 't' or track_counts != 'on' or standby:
+                    return None
+                marks[name] = [filenode, inserted, updated, deleted]
+            for table in tables:
+                if table in WATERMARK_QUERIES:
+                    cur.execute(WATERMARK_QUERIES[table])
+                    marks[table] = [str(value) for value in cur.fetchone()]
+        return marks
+
+    def _lookup(self, key):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT tables, watermarks, fetched_at FROM results WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), json.loads(row[1]), row[2]
+
+    def _touch(self, key):
+        with self._lock:
+            self._conn.execute("UPDATE results SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+
+    def _store(self, key, statement, tables, marks, df):
+        path = self._path(key)
+        try:
+            df.to_parquet(path + '.tmp', index=False)
+            os.replace(path + '.tmp', path)
+        except (OSError, ValueError, TypeError) as e:
+            # Columns pyarrow can't type (e.g. mixed values): this result just isn't cached
+            print(f"⚠️ Could not cache query result ({e})")
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, normalize_sql(statement), json.dumps(tables), json.dumps(marks), now, now,
+                 os.path.getsize(path)),
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        """Drop least recently used results until the store fits max_bytes"""
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._conn.execute("SELECT key, size FROM results ORDER BY accessed_at").fetchall()
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM results WHERE key = ?", (key,))
+            if os.path.exists(self._path(key)):
+                os.remove(self._path(key))
+            total -= size
+
+    def fetch(self, conn, query, params=None):
+        """Return the query's result as a DataFrame, from the cache while its tables are unchanged"""
+        with conn.cursor() as cur:
+            statement = cur.mogrify(query, params).decode() if params else query
+        if VOLATILE_RE.search(_LITERAL_RE.sub("''", statement)):
+            return fetch_frame(conn, query, params)
+
+        key = self.make_key(conn, statement)
+        entry = None if self.refresh else self._lookup(key)
+        tables = entry[0] if entry else self.relations(conn, statement)
+        marks = self.watermarks(conn, tables) if tables else None
+        if marks is None:
+            return fetch_frame(conn, query, params)
+
+        expired = entry and self.max_age is not None and time.time() - entry[2] > self.max_age
+        if entry and not expired and entry[1] == marks and os.path.exists(self._path(key)):
+            df = pd.read_parquet(self._path(key))
+            self._touch(key)
+            self.hits += 1
+            print(f"💾 Served {len(df)} rows from the query cache (tables unchanged)")
+            return df
+
+        # Watermarks are read before the query, so a write landing meanwhile forces a re-fetch next time
+        df = fetch_frame(conn, query, params)
+        self._store(key, statement, tables, marks, df)
+        self.misses += 1
+        return df
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def cached_query(conn, query, params=None, cache=None):
+    """Run a SELECT into a DataFrame, through cache when one is given (None bypasses it)"""
+    if cache is None:
+        return fetch_frame(conn, query, params)
+    return cache.fetch(conn, query, params)
+
+
+def benchmark(repeats=5):
+    """Time a cold fetch against warm cache hits (run against a local PostgreSQL fixture)"""
+    import tempfile
+    from db import connection
+    from report_pipeline import build_shared_query, shared_columns
+
+    query = build_shared_query(shared_columns())
+    with connection() as conn, tempfile.TemporaryDirectory() as directory:
+        cache = QueryCache(directory)
+        start = time.perf_counter()
+        rows = len(fetch_frame(conn, query, (2025,)))
+        direct = time.perf_counter() - start
+        cache.fetch(conn, query, (2025,))   # cold: plan, watermarks, query, write Parquet
+
+        timings = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                cache.fetch(conn, query, (2025,))
+            timings.append(time.perf_counter() - start)
+        cache.close()
+    print(f"📊 Query cache benchmark: sp_def14a shared fetch, {rows:,} rows")
+    print(f"   direct fetch : {direct:.3f}s")
+    print(f"   cache hit    : {min(timings):.3f}s (watermark check + Parquet read)")
+
+
+if __name__ == "__main__":
+    if '--benchmark' in sys.argv:
+        benchmark()
@@ -0,0 +1,172 @@
+import contextlib
+import io
+import sys
+import time
+import warnings
+warnings.filterwarnings('ignore')
+
+import company_meeting_analysis
+import focused_validation
+import meeting_date_analysis
+from db import get_connection, release_connection
+from input_workbook import read_input_workbook
+from query_cache import QueryCache, cached_query
+
+# ===== CONFIGURATION =====
+PROXY_SEASON = 2025
+input_file = "Russell3000 Feb 2025(Upcoming shareholder meeting).xlsx"
+
+# Serve unchanged query results from the local result cache (run with --refresh to re-query)
+USE_QUERY_CACHE = True
+FORCE_REFRESH = '--refresh' in sys.argv
+
+# Output column -> SQL expression for everything the sp_def14a reports select
+SP_DEF14A_COLUMNS = {
+    'company_id': 'c.id',
+    'company_name': 'c.name',
+    'company_ticker': 'c.symbol',
+    'country': 'c.country',
+    'proposal_num': 's.proposal_num',
+    'proposal_name': 's.proposal_name',
+    'filing_date': 's.filing_date',
+    'vote_outcome': 's.vote_outcome',
+    'percentage_support': 's.percentage_support',
+    'outcome_percentage': 's.outcome_percentage',
+    'proxy_season': 's.proxy_season',
+    'year': 's.year',
+    'category': 's.category',
+    'sub_category': 's.sub_category',
+    'proponent': 's.proponent',
+    'link_to_filing': 's.link_to_filing',
+}
+
+# Reports run over the shared frame, in order
+STAGES = (focused_validation, company_meeting_analysis, meeting_date_analysis)
+
+
+def shared_columns(stages=STAGES):
+    """Union of the stages' DB_COLUMNS, in first-seen order"""
+    return list(dict.fromkeys(column for stage in stages for column in stage.DB_COLUMNS))
+
+
+def build_shared_query(columns):
+    select_list = ',\n                '.join(f"{SP_DEF14A_COLUMNS[column]} AS {column}" for column in columns)
+    return f"""
+            SELECT DISTINCT
+                {select_list}
+            FROM public.sp_def14a s
+            LEFT JOIN public.company c ON s.company_id = c.id
+            WHERE s.proxy_season = %s
+            ORDER BY company_ticker;
+        """
+
+
+def fetch_shared_frame(conn, columns, proxy_season=PROXY_SEASON, cache=None):
+    """One round-trip for every report: the DISTINCT union of their columns, ordered by ticker"""
+    return cached_query(conn, build_shared_query(columns), (proxy_season,), cache=cache)
+
+
+def stage_frame(shared_df, columns, filing_dates_only=False):
+    """A stage's view of the shared frame, as its own SELECT DISTINCT would have returned it.
+
+    Projecting to fewer columns can make rows equal, so duplicates are
+    dropped again. The shared frame is already in the server's ticker
+    order; a stable sort on filing_date reproduces
+    `ORDER BY s.filing_date, c.symbol` without re-sorting tickers in Python.
+    """
+    df = shared_df
+    if filing_dates_only:
+        df = df[df['filing_date'].notna()]
+    df = df[columns].drop_duplicates()
+    if filing_dates_only:
+        df = df.sort_values('filing_date', kind='stable')
+    return df.reset_index(drop=True)
+
+
+def run_pipeline(conn, input_path=input_file):
+    """Fetch once, read the input workbook once, then run every report over the shared data"""
+    print(f"📖 Reading input file: {input_path}")
+    input_df = read_input_workbook(input_path)
+    print(f"✅ Loaded {len(input_df)} records from input file")
+
+    columns = shared_columns()
+    print(f"\n📥 Fetching {len(columns)} sp_def14a columns for {PROXY_SEASON} (shared by {len(STAGES)} reports)...")
+    cache = QueryCache(refresh=FORCE_REFRESH) if USE_QUERY_CACHE else None
+    shared_df = fetch_shared_frame(conn, columns, cache=cache)
+    print(f"✅ Fetched {len(shared_df)} records from database")
+
+    print("\n" + "=" * 80 + "\n🎯 Stage 1/3: focused validation")
+    focused_validation.run_report(input_df.copy(), stage_frame(shared_df, focused_validation.DB_COLUMNS))
+
+    print("\n" + "=" * 80 + "\n🚀 Stage 2/3: company meeting analysis")
+    company_meeting_analysis.run_report(input_df.copy(),
+                                        stage_frame(shared_df, company_meeting_analysis.DB_COLUMNS))
+
+    print("\n" + "=" * 80 + "\n📊 Stage 3/3: proxy filing analysis")
+    meeting_date_analysis.run_report(stage_frame(shared_df, meeting_date_analysis.DB_COLUMNS,
+                                                 filing_dates_only=True))
+    return shared_df
+
+
+def benchmark(conn, repeats=3):
+    """Time the three per-report fetches against one shared fetch plus the stage projections"""
+    separate = (
+        focused_validation.fetch_db_companies_with_details,
+        company_meeting_analysis.fetch_db_companies,
+        meeting_date_analysis.fetch_company_meeting_data,
+    )
+    columns = shared_columns()
+    for stage in STAGES:
+        stage.USE_QUERY_CACHE = False   # time the database, not the result cache
+
+    def best(fn):
+        timings = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                fn()
+            timings.append(time.perf_counter() - start)
+        return min(timings)
+
+    def shared():
+        shared_df = fetch_shared_frame(conn, columns)
+        stage_frame(shared_df, focused_validation.DB_COLUMNS)
+        stage_frame(shared_df, company_meeting_analysis.DB_COLUMNS)
+        stage_frame(shared_df, meeting_date_analysis.DB_COLUMNS, filing_dates_only=True)
+
+    separate_time = best(lambda: [fetch(conn) for fetch in separate])
+    shared_time = best(shared)
+    print(f"📊 sp_def14a fetch benchmark (best of {repeats})")
+    print(f"   3 report queries         : {separate_time:.2f}s")
+    print(f"   1 shared query + 3 views : {shared_time:.2f}s")
+
+
+def main():
+    """Main execution function"""
+    print("🚀 Starting the 2025 report pipeline (focused validation, meeting analysis, filing analysis)...")
+
+    conn = None
+    try:
+        print("\n🔌 Connecting to database...")
+        conn = get_connection()
+        print("✅ Database connection established")
+
+        if '--benchmark' in sys.argv:
+            benchmark(conn)
+            return
+
+        run_pipeline(conn)
+        print("\n🎉 All reports completed successfully!")
+        for stage in STAGES:
+            print(f"   📁 {stage.output_file}")
+
+    except Exception as e:
+        print(f"❌ Error during report pipeline: {e}")
+        import traceback
+        traceback.print_exc()
+    finally:
+        release_connection(conn)
+
+
+if __name__ == "__main__":
+    main()
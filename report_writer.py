@@ -0,0 +1,182 @@
+import os
+import resource
+import sys
+import time
+from multiprocessing import get_context
+
+import numpy as np
+import pandas as pd
+import xlsxwriter
+
+# ===== CONFIGURATION =====
+EXCEL_MAX_ROWS = 1_048_576       # including the header row
+CHUNK_ROWS = 10_000              # rows converted for writing at a time
+OVERFLOW_FORMAT = 'parquet'      # 'parquet' or 'csv' for sheets too large for Excel
+
+
+class StreamingReportWriter:
+    """Multi-sheet .xlsx writer that streams rows (xlsxwriter constant_memory mode).
+
+    Each sheet is flushed to disk as soon as the next one starts, so memory
+    stays flat however many sheets or rows are written. Sheets take a
+    frame (or several, written one after another) plus an optional column
+    list, header names and boolean row mask, so filtered views never need
+    a .copy(). Sheets longer than Excel's row limit are written next to the
+    workbook as Parquet/CSV instead, with a pointer sheet in their place.
+    missing maps column names to the text written for their missing
+    values (e.g. 'N/A'); other missing values are left blank.
+    """
+
+    def __init__(self, path, overflow_format=OVERFLOW_FORMAT, missing=None):
+        self.path = path
+        self.overflow_format = overflow_format
+        self.missing = dict(missing or {})
+        self.overflow_files = []
+        self.workbook = xlsxwriter.Workbook(path, {
+            'constant_memory': True,
+            'default_date_format': 'yyyy-mm-dd hh:mm:ss',
+            'remove_timezone': True,
+            'strings_to_urls': False,
+        })
+        self._header_format = self.workbook.add_format({'bold': True, 'border': 1})
+
+    def write_sheet(self, name, frames, columns=None, headers=None, mask=None):
+        """Write one sheet; returns the number of data rows written.
+
+        frames is a DataFrame or a list of them; mask (a boolean array, only
+        with a single frame) selects the rows to write.
+        """
+        if isinstance(frames, pd.DataFrame):
+            frames = [frames]
+        columns = list(columns if columns is not None else frames[0].columns)
+        headers = list(headers if headers is not None else columns)
+        positions = [np.flatnonzero(np.asarray(mask)) if mask is not None else None]
+        positions += [None] * (len(frames) - 1)
+
+        total = sum(len(frame) if rows is None else len(rows) for frame, rows in zip(frames, positions))
+        if total >= EXCEL_MAX_ROWS:
+            return self._write_overflow(name, frames, positions, columns, headers, total)
+
+        sheet = self.workbook.add_worksheet(name)
+        sheet.write_row(0, 0, headers, self._header_format)
+        row = 1
+        for chunk in self._chunks(frames, positions, columns):
+            for values in chunk:
+                sheet.write_row(row, 0, values)
+                row += 1
+        return total
+
+    def _chunks(self, frames, positions, columns):
+        """Yield row tuples CHUNK_ROWS at a time (missing values as None or their sentinel); only a chunk is ever copied"""
+        fill = {column: self.missing[column] for column in columns if column in self.missing}
+        for frame, rows in zip(frames, positions):
+            column_positions = frame.columns.get_indexer(columns)
+            count = len(frame) if rows is None else len(rows)
+            for start in range(0, count, CHUNK_ROWS):
+                selection = slice(start, start + CHUNK_ROWS) if rows is None else rows[start:start + CHUNK_ROWS]
+                chunk = frame.iloc[selection, column_positions]
+                chunk = chunk.astype(object).where(chunk.notna(), None)
+                if fill:
+                    chunk = chunk.fillna(fill)
+                yield chunk.itertuples(index=False, name=None)
+
+    def _fill_missing(self, data, columns):
+        """data with self.missing's sentinels in place of missing values, as the sheets show them"""
+        fill = {column: self.missing[column] for column in columns
+                if column in self.missing and data[column].isna().any()}
+        if not fill:
+            return data
+        data = data.copy()
+        for column, sentinel in fill.items():
+            values = data[column].astype(object)
+            values = values.where(values.notna(), sentinel)
+            # Parquet needs one type per column: with the sentinel mixed in, the column is written as text
+            data[column] = values if self.overflow_format == 'csv' else values.astype(str)
+        return data
+
+    def _write_overflow(self, name, frames, positions, columns, headers, total):
+        stem = os.path.splitext(self.path)[0]
+        overflow_path = f"{stem}_{name}.{self.overflow_format}"
+        parts = [frame[columns] if rows is None else frame[columns].iloc[rows] for frame, rows in zip(frames, positions)]
+        data = pd.concat(parts, ignore_index=True) if len(parts) > 1 else parts[0]
+        data = self._fill_missing(data, columns)
+        data = data.set_axis(headers, axis=1)
+        if self.overflow_format == 'csv':
+            data.to_csv(overflow_path, index=False)
+        else:
+            data.to_parquet(overflow_path, index=False)
+        self.overflow_files.append(overflow_path)
+
+        sheet = self.workbook.add_worksheet(name)
+        sheet.write_row(0, 0, ['Note'], self._header_format)
+        sheet.write_string(1, 0, f"{total:,} rows exceed Excel's limit; written to {os.path.basename(overflow_path)}")
+        print(f"⚠️ Sheet {name} has {total:,} rows - written to {overflow_path}")
+        return total
+
+    def close(self):
+        self.workbook.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def _synthetic_report_frame(rows):
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        'Company': [f"Company {i}" for i in range(rows)],
+        'Ticker': [f"T{i}" for i in range(rows)],
+        'Meeting_Date': pd.Timestamp('2025-01-01') + pd.to_timedelta(rng.integers(0, 365, rows), unit='D'),
+        'DB_Found': np.where(rng.random(rows) < 0.9, 'Yes', 'No'),
+        'DB_Proposal_Count': rng.integers(0, 20, rows),
+        'Support': rng.random(rows) * 100,
+        'Notes': 'Meeting already held - check database for results',
+    })
+
+
+def _write_with_openpyxl(path, df):
+    with pd.ExcelWriter(path, engine='openpyxl') as writer:
+        df.to_excel(writer, sheet_name='All', index=False)
+        df[df['DB_Found'] == 'Yes'].copy().to_excel(writer, sheet_name='Found', index=False)
+        df[df['DB_Found'] == 'No'].copy().to_excel(writer, sheet_name='Not_Found', index=False)
+
+
+def _write_streaming(path, df):
+    found = (df['DB_Found'] == 'Yes').to_numpy()
+    with StreamingReportWriter(path) as writer:
+        writer.write_sheet('All', df)
+        writer.write_sheet('Found', df, mask=found)
+        writer.write_sheet('Not_Found', df, mask=~found)
+
+
+def _benchmark_run(engine, rows, path):
+    """Runs in a fresh process so ru_maxrss is this writer's peak alone"""
+    df = _synthetic_report_frame(rows)
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    (_write_streaming if engine == 'streaming' else _write_with_openpyxl)(path, df)
+    elapsed = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return elapsed, (peak - baseline) / 1024  # ru_maxrss is in KiB on Linux
+
+
+def benchmark(sizes=(10_000, 100_000, 300_000), path='report_writer_benchmark.xlsx'):
+    """Compare write time and peak RSS growth: openpyxl ExcelWriter vs StreamingReportWriter (3 sheets)"""
+    print("📊 Report writer benchmark (3 sheets: all rows + two filtered views)")
+    context = get_context('spawn')
+    try:
+        for rows in sizes:
+            for engine in ('openpyxl', 'streaming'):
+                with context.Pool(1) as pool:
+                    elapsed, rss_mb = pool.apply(_benchmark_run, (engine, rows, path))
+                print(f"   {rows:>9,} rows  {engine:<10} {elapsed:6.2f}s  peak RSS +{rss_mb:,.0f} MB")
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    if '--benchmark' in sys.argv:
+        benchmark()
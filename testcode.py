@@ -1,17 +1,18 @@
 import pandas as pd
-import psycopg2
 from datetime import datetime
 
+from db import connection
+from input_workbook import read_input_workbook
+from ticker_normalize import normalize_tickers
+from ticker_set import ticker_table
+
 # --- Config ---
 input_file = "Russell3000 Feb 2025(Upcoming shareholder meeting).xlsx"
 output_file = "Prod_2024_2025_Validation_Input_Russell3000_DB_Match_Output.xlsx"
 
-DB_CONFIG = {
-    #   // Please Add DB Creds
-}
 
 # --- Load Excel ---
-df = pd.read_excel(input_file)
+df = read_input_workbook(input_file)
 today = pd.Timestamp.today().normalize()
 
 # Filter by date (year=2025 and < today)
@@ -20,14 +21,13 @@ df[date_col] = pd.to_datetime(df[date_col], errors="coerce")
 df = df[(df[date_col].dt.year == 2025) & (df[date_col] < today)]
 
 # Clean tickers (remove -US etc.)
-tickers = df['Ticker'].str.replace('-US', '', regex=False).str.replace('-us', '', regex=False).str.strip().tolist()
+tickers = normalize_tickers(df['Ticker']).tolist()
 tickers = list(set([t for t in tickers if t]))  # unique & non-empty
 
 print(f"Tickers to query ({len(tickers)}): {tickers}")
 
 # --- Query DB ---
-placeholders = ', '.join(['%s'] * len(tickers))
-query = f"""
+query = """
 SELECT 
     c.id,
     c."name",
@@ -41,12 +41,12 @@ FROM public.company c
 JOIN public.home_meeting_details hmd 
     ON c.id = hmd.company_id
 WHERE hmd.year IN (2024, 2025)
-  AND c.symbol IN ({placeholders})
+  AND c.symbol IN (SELECT ticker FROM {table})
 """
 
-with psycopg2.connect(**DB_CONFIG) as conn:
-    with conn.cursor() as cur:
-        cur.execute(query, tickers)
+with connection() as conn:
+    with ticker_table(conn, tickers) as table, conn.cursor() as cur:
+        cur.execute(query.format(table=table))
         rows = cur.fetchall()
 
 columns = [
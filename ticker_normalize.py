@@ -0,0 +1,47 @@
+import re
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+# ===== CONFIGURATION =====
+# Exchange codes stripped from the end of input tickers (ABC-US -> ABC). Other
+# listings (-CA, -GB) are kept: ABC-CA is not necessarily the database's ABC.
+EXCHANGE_SUFFIXES = ('US',)
+# Verified aliases, applied after normalization: {'input spelling': 'database spelling'}.
+# Share classes are only rewritten through here, e.g. 'BRK-B': 'BRK.B' once the
+# database spelling has been checked; unlisted spellings are left as written.
+TICKER_ALIASES = {}
+
+EXCHANGE_SUFFIX_RE = re.compile(r'-(?:' + '|'.join(map(re.escape, EXCHANGE_SUFFIXES)) + r')$')
+
+
+@lru_cache(maxsize=65536)
+def _normalize(ticker):
+    ticker = EXCHANGE_SUFFIX_RE.sub('', ticker.strip().upper()).strip()
+    if not ticker:
+        return None
+    return TICKER_ALIASES.get(ticker, ticker)
+
+
+def normalize_ticker(ticker):
+    """Normalize one ticker: upper-case, -US suffix removed, then TICKER_ALIASES.
+
+    Returns None for missing or empty tickers.
+    """
+    if ticker is None or (not isinstance(ticker, str) and pd.isna(ticker)):
+        return None
+    return _normalize(str(ticker))
+
+
+def normalize_tickers(tickers):
+    """normalize_ticker over a Series (or list); returns an object Series with None for missing.
+
+    Each distinct value is normalized once and the results are broadcast
+    back with a take, which beats both .apply and regex .str chains on
+    ticker columns (few distinct values, many rows).
+    """
+    series = tickers if isinstance(tickers, pd.Series) else pd.Series(tickers)
+    codes, uniques = pd.factorize(series.astype(object), use_na_sentinel=True)
+    normalized = np.array([normalize_ticker(value) for value in uniques] + [None], dtype=object)
+    return pd.Series(normalized[codes], index=series.index, dtype=object)
@@ -0,0 +1,60 @@
+import csv
+import io
+from contextlib import contextmanager
+
+import psycopg2
+
+# ===== CONFIGURATION =====
+TICKER_TABLE = 'input_tickers'
+
+
+def load_ticker_table(conn, tickers, table=TICKER_TABLE):
+    """COPY tickers (with their position in `tickers`) into a session temp table; returns rows loaded.
+
+    Any previous table of the same name on this connection is replaced.
+    Queries then filter with `c.symbol IN (SELECT ticker FROM input_tickers)`
+    instead of one placeholder per ticker, so the statement (and its plan)
+    is the same size whether the universe has 30 tickers or 30,000.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    count = 0
+    for ticker_pos, ticker in enumerate(tickers):
+        if ticker:
+            writer.writerow((ticker_pos, ticker))
+            count += 1
+    buffer.seek(0)
+
+    with conn.cursor() as cur:
+        cur.execute(f"DROP TABLE IF EXISTS {table}")
+        cur.execute(f"CREATE TEMP TABLE {table} (ticker_pos integer PRIMARY KEY, ticker text NOT NULL)")
+        cur.copy_expert(f"COPY {table} (ticker_pos, ticker) FROM STDIN WITH (FORMAT csv)", buffer)
+        cur.execute(f"CREATE INDEX ON {table} (ticker)")
+        cur.execute(f"ANALYZE {table}")
+    return count
+
+
+def drop_ticker_table(conn, table=TICKER_TABLE):
+    with conn.cursor() as cur:
+        cur.execute(f"DROP TABLE IF EXISTS {table}")
+
+
+@contextmanager
+def ticker_table(conn, tickers, table=TICKER_TABLE):
+    """Load tickers into a temp table for the duration of a with-block.
+
+    The table is dropped on exit so it doesn't linger on the pooled connection.
+    """
+    load_ticker_table(conn, tickers, table)
+    try:
+        yield table
+    finally:
+        try:
+            drop_ticker_table(conn, table)
+        except psycopg2.Error:
+            pass  # broken or aborted connection: the next load replaces the table anyway
+
+
+def ticker_array(tickers):
+    """Tickers as a single array parameter, for `c.symbol = ANY(%s)` filters"""
+    return [list(dict.fromkeys(ticker for ticker in tickers if ticker))]
@@ -0,0 +1,119 @@
+import contextlib
+import io
+import sys
+import time
+
+import pandas as pd
+
+# ===== CONFIGURATION =====
+MISSING = 'N/A'   # how missing database values read in the exported workbooks
+
+# Column -> dtype of each validation result frame. Repeated labels are categoricals;
+# database ids, numbers and dates keep their type and use NA where the old frames held 'N/A'.
+FOCUSED_SCHEMA = {
+    'DB_Found': 'category',
+    'DB_Company_ID': 'Int64',
+    'DB_Country': 'category',
+    'DB_Filing_Date': 'datetime64[ns]',
+    'DB_Category': 'category',
+    'DB_Sub_Category': 'category',
+    'DB_Vote_Outcome': 'category',
+    'DB_Support_Percentage': 'Float64',
+    'DB_Outcome_Percentage': 'Float64',
+    'DB_Proponent': 'category',
+    'DB_Proposal_Num': 'category',
+    'Validation_Status': 'category',
+    'Notes': 'category',
+}
+
+COMPANY_MEETING_SCHEMA = {
+    'Meeting_Status': 'category',
+    'Days_Info': 'category',
+    'DB_Found': 'category',
+    'DB_Company_ID': 'Int64',
+    'DB_Filing_Date': 'datetime64[ns]',
+    'DB_Category': 'category',
+    'Notes': 'category',
+}
+
+MEETING_VALIDATION_SCHEMA = {
+    'Validation_Status': 'category',
+    'Database_Meeting_Date': 'datetime64[ns]',
+    'Database_Proposal': 'category',
+    'Match_Method': 'category',
+    'Date_Difference_Days': 'Int64',
+}
+
+# Columns whose missing values are exported as MISSING (database columns of unmatched rows)
+FOCUSED_MISSING = {column: MISSING for column in (
+    'DB_Company_ID', 'DB_Company_Name', 'DB_Country', 'DB_Filing_Date', 'DB_Category', 'DB_Sub_Category',
+    'DB_Vote_Outcome', 'DB_Support_Percentage', 'DB_Outcome_Percentage', 'DB_Proponent', 'DB_Proposal_Num',
+    'DB_Link_To_Filing',
+)}
+COMPANY_MEETING_MISSING = {column: MISSING for column in (
+    'DB_Company_Name', 'DB_Company_ID', 'DB_Filing_Date', 'DB_Category',
+)}
+
+
+def _convert(values, dtype):
+    if dtype == 'Int64':
+        return pd.to_numeric(values, errors='coerce').astype('Int64')
+    if dtype == 'Float64':
+        return pd.to_numeric(values, errors='coerce').astype('Float64')
+    if dtype.startswith('datetime64'):
+        return pd.to_datetime(values, errors='coerce').astype(dtype)
+    return values.astype(dtype)
+
+
+def apply_schema(df, schema):
+    """Convert df's schema columns in place (columns the frame lacks are skipped); returns df"""
+    for column, dtype in schema.items():
+        if column in df.columns:
+            df[column] = _convert(df[column], dtype)
+    return df
+
+
+def render_missing(df, schema, missing):
+    """The frame as the exports show it: schema columns as plain objects, missing values as their sentinel"""
+    rendered = df.copy()
+    for column in dict.fromkeys([*schema, *missing]):
+        if column in rendered.columns:
+            values = rendered[column].astype(object)
+            rendered[column] = values.where(values.notna(), missing.get(column))
+    return rendered
+
+
+def frame_memory(df):
+    """Bytes held by the frame, strings included"""
+    return int(df.memory_usage(deep=True).sum())
+
+
+def benchmark(n_companies=300_000):
+    """Memory of the typed validation frames against their rendered (object + 'N/A') form"""
+    from company_meeting_analysis import analyze_companies, make_synthetic_inputs
+    from focused_validation import validate_russell3000_against_db
+
+    input_df, db_df = make_synthetic_inputs(n_companies)
+    db_df['outcome_percentage'] = db_df['percentage_support']
+    for column in ('vote_outcome', 'proponent', 'proposal_num', 'link_to_filing'):
+        db_df[column] = db_df['proposal_name']
+
+    print(f"📊 Validation frame memory: {n_companies:,} input rows / {len(db_df):,} DB rows")
+    runs = (
+        ('focused_validation', validate_russell3000_against_db, FOCUSED_SCHEMA, FOCUSED_MISSING),
+        ('company_meeting_analysis', analyze_companies, COMPANY_MEETING_SCHEMA, COMPANY_MEETING_MISSING),
+    )
+    for name, validator, schema, missing in runs:
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            typed = validator(input_df.copy(), db_df.copy())
+        elapsed = time.perf_counter() - start
+        before = frame_memory(render_missing(typed, schema, missing))
+        after = frame_memory(typed)
+        print(f"   {name:<25} object + 'N/A' {before / 2**20:7.1f} MB -> typed {after / 2**20:7.1f} MB "
+              f"({after / before:.0%}), validated in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    if '--benchmark' in sys.argv:
+        benchmark()
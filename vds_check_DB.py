@@ -1,11 +1,18 @@
 import pandas as pd
-import psycopg2
+
+from db import connection
+from db_extract import copy_export, export_query
 
 # --- Config ---
 output_file = "Prod_VDS_CHECK_Multiple_Country_2024_2025_Russell3000_DB_FetchedData.xlsx"
-DB_CONFIG = {
-#    // Please Add DB Creds
-}
+
+# How rows are pulled:
+#   'stream'   - server-side cursor, written chunk by chunk (flat memory)
+#   'copy'     - COPY ... TO STDOUT parsed into typed columns (fastest on large pulls)
+#   'read_sql' - load the whole result with pd.read_sql first
+EXTRACT_MODE = 'stream'
+ITERSIZE = 20000
+
 # --- SQL Query ---
 query = """
 SELECT DISTINCT
@@ -28,19 +35,29 @@ ORDER BY hmd.meeting_date;
 """
 
 # --- Query DB ---
-with psycopg2.connect(**DB_CONFIG) as conn:
-    df_out = pd.read_sql(query, conn)
+if EXTRACT_MODE == 'stream':
+    print("\nStreaming rows (first 20 shown):")
+    row_count = export_query(query, output_file, itersize=ITERSIZE)
+    print(f"\nRows returned: {row_count}")
+    print(f"\n✅ Data exported successfully to: {output_file}")
+elif EXTRACT_MODE == 'copy':
+    row_count = copy_export(query, output_file)
+    print(f"\nRows returned: {row_count}")
+    print(f"\n✅ Data exported successfully to: {output_file}")
+else:
+    with connection() as conn:
+        df_out = pd.read_sql(query, conn)
 
-print(f"\nRows returned: {len(df_out)}\n")
+    print(f"\nRows returned: {len(df_out)}\n")
 
-# --- Console Display (Excel-like table) ---
-pd.set_option("display.max_columns", None)     # show all columns
-pd.set_option("display.width", None)           # don't cut off
-pd.set_option("display.colheader_justify", "left")
-pd.set_option("display.expand_frame_repr", False)
+    # --- Console Display (Excel-like table) ---
+    pd.set_option("display.max_columns", None)     # show all columns
+    pd.set_option("display.width", None)           # don't cut off
+    pd.set_option("display.colheader_justify", "left")
+    pd.set_option("display.expand_frame_repr", False)
 
-print(df_out.to_string(index=False))  # aligned tabular view
+    print(df_out.to_string(index=False))  # aligned tabular view
 
-# --- Save to Excel ---
-df_out.to_excel(output_file, index=False)
-print(f"\n✅ Data exported successfully to: {output_file}")
\ No newline at end of file
+    # --- Save to Excel ---
+    df_out.to_excel(output_file, index=False)
+    print(f"\n✅ Data exported successfully to: {output_file}")
@@ -0,0 +1,291 @@
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+from zmh_resilience import (
+    CircuitBreaker, CircuitOpenError, RequestMetrics, TokenBucket,
+    MAX_RETRIES, RETRY_STATUSES, DEFAULT_RATE, backoff_delay, retry_after_seconds,
+)
+
+# ===== CONFIGURATION =====
+# Default number of pages fetched in parallel
+DEFAULT_MAX_WORKERS = 8
+REQUEST_TIMEOUT = 60  # seconds
+
+
+class IncompletePagesError(requests.exceptions.RequestException):
+    """Raised when pages of a paginated fetch still failed after every retry.
+
+    failed_pages holds their 1-based page numbers; results holds the
+    records of the pages that did arrive, in page order (fetch_all_pages),
+    or None when the caller streamed them elsewhere.
+    """
+
+    def __init__(self, failed_pages, results=None):
+        super().__init__(f"{len(failed_pages)} page(s) could not be fetched: {failed_pages}")
+        self.failed_pages = failed_pages
+        self.results = results
+
+
+def create_session(pool_size=DEFAULT_MAX_WORKERS, cache=None, rate=DEFAULT_RATE):
+    """Create a requests session whose connection pool fits the worker count.
+
+    Every request made through fetch_page on this session shares one
+    adaptive rate limiter, circuit breaker and set of metrics. If a
+    zmh_cache.ResponseCache is given, responses are also served and stored
+    through it.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.response_cache = cache
+    session.rate_limiter = TokenBucket(rate=rate, burst=max(1, pool_size))
+    session.circuit_breaker = CircuitBreaker()
+    session.metrics = RequestMetrics()
+    return session
+
+
+def send_request(session, url, headers):
+    """GET url with rate limiting, retries and the circuit breaker.
+
+    429s and 5xx responses are retried with jittered exponential backoff
+    (or after Retry-After when the server sends one); connection errors and
+    timeouts are retried the same way. Returns the final response.
+    """
+    limiter = getattr(session, 'rate_limiter', None)
+    breaker = getattr(session, 'circuit_breaker', None)
+    metrics = getattr(session, 'metrics', None) or RequestMetrics()
+    endpoint = urlsplit(url).path
+
+    for attempt in range(MAX_RETRIES + 1):
+        if limiter:
+            limiter.acquire()
+        if breaker and not breaker.allow():
+            metrics.record_failure(endpoint)
+            raise CircuitOpenError(f"Circuit open, not requesting {url}")
+
+        start = time.monotonic()
+        try:
+            response = session.get(url, headers=headers, timeout=REQUEST_TIMEOUT)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+            metrics.record(endpoint, time.monotonic() - start)
+            if breaker:
+                breaker.record_failure()
+            if attempt == MAX_RETRIES:
+                metrics.record_failure(endpoint)
+                raise
+            metrics.record_retry(endpoint)
+            time.sleep(backoff_delay(attempt))
+            continue
+        except BaseException:
+            # Not a sign of server health either way, but a half-open trial must not stay claimed
+            if breaker:
+                breaker.release_trial()
+            raise
+        metrics.record(endpoint, time.monotonic() - start)
+
+        if response.status_code not in RETRY_STATUSES:
+            if breaker:
+                breaker.record_success()
+            if limiter:
+                limiter.recover()
+            return response
+
+        # 429 means slow down; 5xx means the server is struggling
+        if response.status_code == 429:
+            if limiter:
+                limiter.throttle()
+            if breaker:
+                breaker.release_trial()
+        elif breaker:
+            breaker.record_failure()
+        if attempt == MAX_RETRIES:
+            metrics.record_failure(endpoint)
+            return response
+        metrics.record_retry(endpoint)
+        delay = retry_after_seconds(response)
+        time.sleep(delay if delay is not None else backoff_delay(attempt))
+
+
+def fetch_page(session, url, headers):
+    """Fetch one API page and return the decoded JSON (None on failure)"""
+    cache = getattr(session, 'response_cache', None)
+    if cache is None:
+        try:
+            response = send_request(session, url, headers)
+            response.raise_for_status()
+            return response.json()
+        except requests.exceptions.RequestException as e:
+            print(f"❌ Error fetching data from {url}: {e}")
+            return None
+
+    key = cache.make_key(url, headers)
+    entry = None if cache.refresh else cache.get(key)
+    if entry and cache.is_fresh(entry):
+        return entry['data']
+
+    # Stale entry: revalidate with the validators the server gave us
+    request_headers = dict(headers or {})
+    if entry and entry['etag']:
+        request_headers['If-None-Match'] = entry['etag']
+    if entry and entry['last_modified']:
+        request_headers['If-Modified-Since'] = entry['last_modified']
+
+    try:
+        response = send_request(session, url, request_headers)
+        if response.status_code == 304 and entry:
+            cache.touch(key)
+            return entry['data']
+        response.raise_for_status()
+        data = response.json()
+    except requests.exceptions.RequestException as e:
+        print(f"❌ Error fetching data from {url}: {e}")
+        return None
+
+    cache.put(key, url, data, response.headers.get('ETag'), response.headers.get('Last-Modified'))
+    return data
+
+
+def with_query(url, **params):
+    """Return url with the given query parameters set (others are kept)"""
+    parts = urlsplit(url)
+    query = dict(parse_qsl(parts.query))
+    query.update({key: str(value) for key, value in params.items()})
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+def build_page_urls(next_url, count, page_size):
+    """Build the URLs of pages 2..N from the first page's 'next' link.
+
+    Supports DRF page-number (?page=) and limit/offset (?offset=) pagination.
+    Returns None when the pagination style is not recognised (e.g. cursors).
+    """
+    if not next_url or not page_size:
+        return []
+
+    total_pages = -(-count // page_size)  # ceiling division
+    query = dict(parse_qsl(urlsplit(next_url).query))
+
+    if 'page' in query:
+        return [with_query(next_url, page=page) for page in range(2, total_pages + 1)]
+    if 'offset' in query:
+        return [
+            with_query(next_url, offset=page * page_size, limit=page_size)
+            for page in range(1, total_pages)
+        ]
+    return None
+
+
+def iter_pages_serial(url, headers, session=None):
+    """Follow data['next'] one page at a time, yielding each page's results.
+
+    A page that cannot be fetched yields None and ends the walk.
+    """
+    session = session or create_session(1)
+    next_url = url
+
+    while next_url:
+        print(f"Fetching: {next_url}")
+        data = fetch_page(session, next_url, headers)
+        if not data or 'results' not in data:
+            print(f"❌ Unable to fetch or parse {next_url}")
+            yield None
+            return
+        yield data.get('results', [])
+        next_url = data.get('next')
+
+
+def iter_pages(url, headers, max_workers=DEFAULT_MAX_WORKERS, session=None):
+    """Yield each page's results in page order, fetching pages concurrently.
+
+    The first page gives the total count and page size; the remaining pages
+    go through a bounded thread pool with at most max_workers pages in
+    flight, so memory stays bounded no matter how many pages there are.
+    A page that cannot be fetched yields None in its place.
+    """
+    session = session or create_session(max_workers)
+
+    print(f"Fetching: {url}")
+    first_page = fetch_page(session, url, headers)
+    if not first_page or 'results' not in first_page:
+        print(f"❌ Unable to fetch or parse {url}")
+        yield None
+        return
+
+    first_results = first_page.get('results', [])
+    count = first_page.get('count') or len(first_results)
+    page_urls = build_page_urls(first_page.get('next'), count, len(first_results))
+    yield first_results
+
+    if page_urls is None:
+        print("⚠️ Unrecognised pagination style, falling back to serial fetch")
+        yield from iter_pages_serial(first_page['next'], headers, session)
+        return
+
+    print(f"📄 {count} records over {len(page_urls) + 1} pages, fetching with {max_workers} workers")
+
+    remaining = iter(page_urls)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        in_flight = deque(
+            (page_url, executor.submit(fetch_page, session, page_url, headers))
+            for page_url in islice(remaining, max_workers)
+        )
+        while in_flight:
+            page_url, future = in_flight.popleft()
+            data = future.result()
+            next_page_url = next(remaining, None)
+            if next_page_url:
+                in_flight.append((next_page_url, executor.submit(fetch_page, session, next_page_url, headers)))
+
+            if not data or 'results' not in data:
+                print(f"⚠️ Page missing from results: {page_url}")
+                yield None
+            else:
+                yield data.get('results', [])
+
+
+def fetch_all_pages_serial(url, headers, session=None):
+    """Follow data['next'] one page at a time and return all results"""
+    all_results = []
+    for page in iter_pages_serial(url, headers, session):
+        if page is None:
+            break
+        all_results.extend(page)
+    return all_results
+
+
+def fetch_all_pages(url, headers, max_workers=DEFAULT_MAX_WORKERS, session=None, strict=True):
+    """Fetch every page of a paginated endpoint concurrently and return all results in page order.
+
+    Pages that fail after every retry raise IncompletePagesError when
+    strict (the default); with strict=False they are reported and the
+    records of the other pages are returned.
+    """
+    results = []
+    failed_pages = []
+    for number, page in enumerate(iter_pages(url, headers, max_workers, session), start=1):
+        if page is None:
+            failed_pages.append(number)
+        else:
+            results.extend(page)
+    if failed_pages:
+        if strict:
+            raise IncompletePagesError(failed_pages, results)
+        print(f"⚠️ Results incomplete: {len(failed_pages)} page(s) failed ({failed_pages}), "
+              f"returning {len(results)} records")
+    return results
+
+
+def fetch_many(urls, headers, max_workers=DEFAULT_MAX_WORKERS, session=None):
+    """Fetch a batch of URLs concurrently and return {url: decoded JSON or None}"""
+    session = session or create_session(max_workers)
+    urls = list(dict.fromkeys(urls))  # de-duplicate, keep order
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        responses = executor.map(lambda url: fetch_page(session, url, headers), urls)
+        return dict(zip(urls, responses))
@@ -0,0 +1,132 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from urllib.parse import urlsplit
+
+# ===== CONFIGURATION =====
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.zmh_cache', 'responses.sqlite3')
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Seconds a cached response is served without asking the server, by path prefix
+DEFAULT_TTLS = {
+    '/shareholder_proposal/def14a/': 24 * 60 * 60,
+    '/voting_report_8k/': 24 * 60 * 60,
+}
+DEFAULT_TTL = 60 * 60
+
+
+class ResponseCache:
+    """On-disk cache of decoded JSON API responses.
+
+    Entries are keyed by URL and auth scope (a hash of the Authorization
+    header), stored zlib-compressed in SQLite and evicted least recently used
+    first once the store grows past max_bytes. Stale entries keep their
+    ETag/Last-Modified so they can be revalidated with a conditional request.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_bytes=DEFAULT_MAX_BYTES, ttls=None,
+                 default_ttl=DEFAULT_TTL, refresh=False):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttls = DEFAULT_TTLS if ttls is None else ttls
+        self.default_ttl = default_ttl
+        self.refresh = refresh
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                body BLOB NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                fetched_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                size INTEGER NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(url, headers):
+        """Hash the URL together with the Authorization header (never stored in clear)"""
+        scope = (headers or {}).get('Authorization', '')
+        return hashlib.sha256(f"{scope}\n{url}".encode('utf-8')).hexdigest()
+
+    def ttl_for(self, url):
+        """Return the TTL of the longest configured path prefix matching url"""
+        path = urlsplit(url).path
+        matches = [prefix for prefix in self.ttls if path.startswith(prefix)]
+        if not matches:
+            return self.default_ttl
+        return self.ttls[max(matches, key=len)]
+
+    def get(self, key):
+        """Return the cached entry as a dict, or None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT url, body, etag, last_modified, fetched_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+
+        url, body, etag, last_modified, fetched_at = row
+        return {
+            'url': url,
+            'data': json.loads(zlib.decompress(body)),
+            'etag': etag,
+            'last_modified': last_modified,
+            'fetched_at': fetched_at,
+        }
+
+    def is_fresh(self, entry):
+        """True when the entry is within its endpoint TTL and no refresh was forced"""
+        if self.refresh:
+            return False
+        return time.time() - entry['fetched_at'] < self.ttl_for(entry['url'])
+
+    def put(self, key, url, data, etag=None, last_modified=None):
+        """Store a decoded response and evict old entries if over budget"""
+        body = zlib.compress(json.dumps(data, separators=(',', ':')).encode('utf-8'))
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, url, body, etag, last_modified, now, now, len(body)),
+            )
+            self._evict()
+            self._conn.commit()
+
+    def touch(self, key):
+        """Mark an entry as freshly revalidated (after a 304)"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE responses SET fetched_at = ?, accessed_at = ? WHERE key = ?", (now, now, key)
+            )
+            self._conn.commit()
+
+    def _evict(self):
+        """Drop least recently used entries until the store fits max_bytes"""
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._conn.execute("SELECT key, size FROM responses ORDER BY accessed_at").fetchall()
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
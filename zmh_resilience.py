@@ -0,0 +1,164 @@
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+import requests
+
+# ===== CONFIGURATION =====
+DEFAULT_RATE = 10.0          # requests per second once warmed up
+DEFAULT_BURST = 10           # tokens available at once
+MIN_RATE = 0.5               # floor the adaptive limiter backs off to
+MAX_RETRIES = 5
+BACKOFF_BASE = 0.5           # seconds, doubled per attempt
+BACKOFF_CAP = 30.0
+RETRY_AFTER_CAP = 120.0
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+BREAKER_THRESHOLD = 5        # consecutive failed requests before the circuit opens
+BREAKER_COOLDOWN = 30.0      # seconds the circuit stays open
+
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """Raised instead of sending a request while the circuit breaker is open"""
+
+
+class TokenBucket:
+    """Thread-safe token bucket whose rate adapts to server pushback.
+
+    A 429 halves the rate (down to MIN_RATE); each success nudges it back
+    up towards the configured maximum.
+    """
+
+    def __init__(self, rate=DEFAULT_RATE, burst=DEFAULT_BURST):
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def throttle(self):
+        with self._lock:
+            self.rate = max(MIN_RATE, self.rate / 2)
+
+    def recover(self):
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate * 0.05)
+
+
+class CircuitBreaker:
+    """Fail fast after repeated failures, then let one trial request through after a cooldown"""
+
+    def __init__(self, threshold=BREAKER_THRESHOLD, cooldown=BREAKER_COOLDOWN):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at >= self.cooldown and not self._trial_in_flight:
+                self._trial_in_flight = True  # half-open
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def release_trial(self):
+        """End a half-open trial that said nothing about the server (a 429, a local error).
+
+        The circuit stays as it was; the next allow() after the cooldown may
+        send another trial.
+        """
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._failures >= self.threshold or self._opened_at is not None:
+                if self._opened_at is None:
+                    print(f"⚠️ Circuit opened after {self._failures} consecutive failures")
+                self._opened_at = time.monotonic()
+
+
+class RequestMetrics:
+    """Per-endpoint request, retry, failure and latency counters"""
+
+    def __init__(self):
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def _endpoint(self, endpoint):
+        return self._stats.setdefault(endpoint, {
+            'requests': 0, 'retries': 0, 'failures': 0, 'total_latency': 0.0, 'max_latency': 0.0
+        })
+
+    def record(self, endpoint, latency):
+        with self._lock:
+            stats = self._endpoint(endpoint)
+            stats['requests'] += 1
+            stats['total_latency'] += latency
+            stats['max_latency'] = max(stats['max_latency'], latency)
+
+    def record_retry(self, endpoint):
+        with self._lock:
+            self._endpoint(endpoint)['retries'] += 1
+
+    def record_failure(self, endpoint):
+        with self._lock:
+            self._endpoint(endpoint)['failures'] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {endpoint: dict(stats) for endpoint, stats in self._stats.items()}
+
+    def report(self):
+        """Print a one-line summary per endpoint"""
+        print("\n📈 API request metrics:")
+        for endpoint, stats in sorted(self.snapshot().items()):
+            avg = stats['total_latency'] / stats['requests'] if stats['requests'] else 0
+            print(f"   {endpoint}: {stats['requests']} requests, {stats['retries']} retries, "
+                  f"{stats['failures']} failures, avg {avg * 1000:.0f} ms, max {stats['max_latency'] * 1000:.0f} ms")
+
+
+def retry_after_seconds(response):
+    """Parse a Retry-After header given in seconds or as an HTTP date"""
+    value = response.headers.get('Retry-After')
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            seconds = parsedate_to_datetime(value).timestamp() - time.time()
+        except (TypeError, ValueError):
+            return None
+    return min(RETRY_AFTER_CAP, max(0.0, seconds))
+
+
+def backoff_delay(attempt):
+    """Full-jitter exponential backoff for the given retry attempt (0-based)"""
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
@@ -0,0 +1,101 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+# ===== CONFIGURATION =====
+DEFAULT_PAGE_SIZE = 10
+DEFAULT_PATH = '/shareholder_proposal/def14a/'
+
+
+class StubAPI:
+    """Local stand-in for the ZMH API, for the check_* scripts.
+
+    Serves self.records as a DRF page-number endpoint (count/next/results)
+    with the id ordering and updated_at__gte filter the sync uses. Tests can
+    script failures per page (`fail_page`) or fail every request (`down`),
+    and read back every request made (`requests`).
+    """
+
+    def __init__(self, records=(), page_size=DEFAULT_PAGE_SIZE, path=DEFAULT_PATH):
+        self.records = list(records)
+        self.page_size = page_size
+        self.path = path
+        self.down = False                # answer every request with 503
+        self.retry_after = None          # Retry-After header sent with scripted 429s
+        self.ignore_ordering = False     # serve id order whatever ?ordering= asks for
+        self.requests = []
+        self._scripted = {}
+        self._lock = threading.Lock()
+        self._server = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address
+        return f"http://{host}:{port}{self.path}"
+
+    def fail_page(self, page, *statuses):
+        """Answer the next requests for page with these statuses, then serve it normally"""
+        with self._lock:
+            self._scripted.setdefault(page, []).extend(statuses)
+
+    def _scripted_status(self, page):
+        with self._lock:
+            statuses = self._scripted.get(page)
+            return statuses.pop(0) if statuses else None
+
+    def page(self, query):
+        records = self.records
+        if 'updated_at__gte' in query:
+            records = [r for r in records if str(r.get('updated_at')) >= query['updated_at__gte']]
+        ordering = 'id' if self.ignore_ordering else query.get('ordering', 'id')
+        records = sorted(records, key=lambda r: r[ordering.lstrip('-')], reverse=ordering.startswith('-'))
+
+        page = int(query.get('page', 1))
+        start = (page - 1) * self.page_size
+        results = records[start:start + self.page_size]
+        next_url = None
+        if start + self.page_size < len(records):
+            next_url = f"{self.url}?{urlencode(dict(query, page=page + 1))}"
+        return {'count': len(records), 'next': next_url, 'previous': None, 'results': results}
+
+    def start(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                parts = urlsplit(self.path)
+                query = dict(parse_qsl(parts.query))
+                with stub._lock:
+                    stub.requests.append(self.path)
+                status = 503 if stub.down else stub._scripted_status(int(query.get('page', 1)))
+                if status:
+                    self.send_response(status)
+                    if status == 429 and stub.retry_after is not None:
+                        self.send_header('Retry-After', str(stub.retry_after))
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                body = json.dumps(stub.page(query)).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()